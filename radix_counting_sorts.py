@@ -1,14 +1,137 @@
 import random
 import timeit
+import collections
 import csv
-
-
-def radix_sort(num_list, b):
+import argparse
+import heapq
+import itertools
+import json
+import math
+import mmap
+import multiprocessing
+import operator
+import os
+import pickle
+import platform
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from array import array
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError:     # the array backend is optional
+    np = None
+
+
+# widest digit, in bits, that the base planner will pick: 2^16 counters
+# still fit comfortably in the L2 cache
+_MAX_DIGIT_BITS = 16
+
+# buckets of at most this many keys are finished by msd_radix_sort() with the
+# built-in sort rather than with further digit passes
+_MSD_CUTOFF = 64
+
+# parallel_radix_sort() sorts shorter inputs serially, and splits the rest
+# into this many runs of buckets per worker process
+_PARALLEL_MIN_KEYS = 1 << 16
+_PARALLEL_RUNS_PER_PROCESS = 4
+
+# default memory budget of external_radix_sort(), in bytes, the rough size
+# of one key held as a Python int in a list, and the bytes per key that the
+# NumPy distribution and sorts hold at their peak (the chunk, the digits,
+# the permutation, the reordered keys and their copy as bytes)
+_EXTERNAL_MEMORY_BUDGET = 256 << 20
+_PYTHON_KEY_BYTES = 48
+_NUMPY_KEY_BYTES = 40
+
+# buffer formats that american_flag_sort() can sort, lowercase ones signed
+_BUFFER_INTEGER_FORMATS = "bBhHiIlLqQ"
+
+# iter_radix_sort() sorts runs of this many items, and pickles spilled runs
+# in batches of this many items
+_STREAM_CHUNK_SIZE = 1 << 16
+_SPILL_BATCH_SIZE = 1 << 12
+
+# thresholds of adaptive_sort(), to be checked against the results of the
+# benchmark suite: below _ADAPTIVE_MIN_KEYS values timsort is used, lists of
+# integers with at least _COUNTING_LIST_KEYS_PER_VALUE keys per value in
+# their range are counting sorted, inputs whose sampled pairs are at least
+# _PRESORTED_FRACTION in order (either way) go to timsort, and lists only use
+# the radix engine from _ADAPTIVE_LIST_RADIX_MIN_KEYS values on (None for
+# never)
+_ADAPTIVE_MIN_KEYS = 64
+_COUNTING_LIST_KEYS_PER_VALUE = 8
+_PRESORTED_FRACTION = 0.95
+_ADAPTIVE_SAMPLE_PAIRS = 1024
+_ADAPTIVE_LIST_RADIX_MIN_KEYS = None
+
+# packed_string_sort() packs the first _PACKED_CHARS lowercase characters of
+# a string into 5 bits each, as base 32 digits 1-26 so that an ended string
+# sorts first, above 4 bits that hold the length, or _PACKED_CHARS + 1 for a
+# longer string; the keys are sorted with one radix pass per 16 bits
+_PACKED_CHARS = 12
+_PACKED_DIGITS = str.maketrans("abcdefghijklmnopqrstuvwxyz",
+                               "123456789abcdefghijklmnopq")
+_PACKED_BASE = 1 << 16
+
+# buckets of burst_sort() that grow past this many strings burst into a new
+# trie node
+_BURST_THRESHOLD = 1024
+
+# the string sort of find_rotations() and friends: packed integer keys pay
+# off when their passes run in NumPy, while pure-Python passes lose to the
+# character comparisons of msd_string_sort()
+_STRING_ENGINE = "packed" if np is not None else "msd"
+
+# key distributions that benchmark_sorts() can generate
+BENCHMARK_DISTRIBUTIONS = ("uniform", "zipf", "narrow", "presorted",
+                           "reversed")
+
+# masks for the order-preserving transform of float64 bit patterns
+_SIGN_BIT_64 = 1 << 63
+_MASK_64 = (1 << 64) - 1
+_FLOAT_NAN_KEY = _MASK_64
+
+
+def radix_sort(num_list, b=None, key=None, argsort=False, stats=None):
     """
-    Performs radix sort on num_list (a list of integers) with base b.
+    Performs radix sort on num_list (a list of integers or floats) with base
+    b. Negative integers and floats are first mapped to non-negative integer
+    keys with an order-preserving transform, see _encode_keys(), so they go
+    through the same linear-time passes. If num_list contains any float, all
+    of its values are ordered as float64, but the integers come back as the
+    same integers; an integer that float64 cannot represent exactly raises a
+    ValueError.
+
+    With key, the items of num_list can be anything: key is called once per
+    item and the items are sorted by the integer or float it returns. With
+    argsort, the stable permutation of indices that sorts num_list is
+    returned instead of the items. In both modes only a list of indices is
+    moved during the digit passes, never the items themselves.
+    When b is a power of two, digits are extracted with a shift and a mask
+    instead of a floor division and a modulo. When b is not given, a power of
+    two base is planned from the length of num_list and the largest key, see
+    _plan_radix_bits().
+
+    Each pass is a counting sort: the digits are counted into a flat
+    array('l'), the counts are turned into starting positions with a prefix
+    sum, and the items are scattered into a second preallocated buffer. The
+    two buffers swap roles after every pass.
 
     :param num_list:        (list) The list of numbers to sort.
-    :param b:               (int) The base to sort the numbers to.
+    :param b:               (int) The base to sort the numbers to, or None
+                            to let the base be planned automatically.
+    :param key:             (function) Maps an item to its sort key, or None
+                            to sort the items themselves.
+    :param argsort:         (bool) Return the sorting permutation instead of
+                            the sorted items.
+    :param stats:           (RadixSortStats) Receives the wall time, bucket
+                            histogram, largest bucket and number of items
+                            moved of every digit pass, and a summary. When
+                            None, the passes only pay for one check each.
     :time complexity:       Best Case: O((N + b)M), where N is the total
                             number of integers in the input list, b is the
                             base, M is the number of digits in the largest
@@ -20,16 +143,14 @@ def radix_sort(num_list, b):
                             M is the number of digits in the largest number in
                             the input list, when represented in base b. This
                             occurs when there are more than two numbers in list.
-                            Initialising final_array takes O(N) time. The outer
-                            while loop will iterate a maximum of M times
-                            since you have to sort through each digit
-                            for each number. Initialising count_array takes O(b)
-                            time, updating count_array takes O(N) time,
-                            and updating final_array takes O(N + b) time
-                            because outer for ;oop will iterate b times but the
-                            inner for loop will iterate at most N times
-                            throughout the entire execution of the outer loop.
-                            Thus, the total worst case runtime is O((N + b)M).
+                            Initialising final_array and finding the largest
+                            key takes O(N) time. The outer while loop will
+                            iterate M times since you have to sort through each
+                            digit for each number. Clearing count_array and
+                            taking its prefix sum takes O(b) time, and
+                            counting the digits and scattering the items takes
+                            O(N) time. Thus, the total worst case runtime is
+                            O((N + b)M).
 
     :space complexity:      O(N + b), where N is the length of num_list and
                             b is the base given. Auxiliary space complexity
@@ -38,74 +159,1829 @@ def radix_sort(num_list, b):
 
     :aux space complexity:  O(N + b), where N is the length of num_list
                             and b is the base given. This is because
-                            final_array (the array to return) takes O(N) space
-                            since it has a size of N and count_array takes
-                            O(b) space as it is initialised to a list of size
-                            b at most. Thus, the auxiliary space complexity
-                            is O(N + b).
+                            final_array and other_array take O(N) space each
+                            and count_array takes O(b) space. These are the
+                            only allocations, whatever the base, so peak memory
+                            is two N-sized buffers and one count array.
 
-    :return:                (list) the sorted num_list, final_array
+    :return:                (list) the sorted num_list, final_array, or the
+                            sorting permutation if argsort is set
     """
 
+    if key is not None or argsort:
+        # complexity: O(N) calls to key
+        if key is None:
+            keys = num_list
+        else:
+            keys = [key(item) for item in num_list]
+
+        index_array = list(range(len(num_list)))
+        if len(num_list) >= 2:
+            keys, max_key, _ = _encode_keys(keys, decode=False)
+            index_array = _radix_sort_keys(index_array, max_key, b, keys,
+                                           stats)
+        elif stats is not None:
+            # no passes, but the summary is filled in all the same
+            stats.start(len(num_list), b, 0)
+            stats.finish()
+
+        if argsort:
+            return index_array
+        return [num_list[i] for i in index_array]
+
     # check boundary cases, an empty list and a list with one number are
     # already sorted
     if len(num_list) < 2:
+        if stats is not None:
+            stats.start(len(num_list), b, 0)
+            stats.finish()
         return num_list
 
-    # initialise final_array, the array to return
-    final_array = [None] * len(num_list)
-    for i in range(len(num_list)):
-        final_array[i] = num_list[i]
-    done = False
+    # map the values to non-negative integer keys that sort in the same
+    # order, see _encode_keys()
+    # complexity: O(N)
+    final_array, max_key, codec = _encode_keys(num_list)
+
+    final_array = _radix_sort_keys(final_array, max_key, b, stats=stats)
+
+    # complexity: O(N)
+    return _decode_keys(final_array, codec)
+
+
+def _radix_sort_keys(final_array, max_key, b, keys=None, stats=None):
+    """
+    Radix sort final_array, a list of non-negative integers whose largest
+    value is max_key, with base b. This is the pass loop of radix_sort(),
+    see its docstring for the details and complexities. The list is used as
+    one of the two scatter buffers, so the caller must own it.
+
+    If keys is given, final_array instead holds indices into keys and is
+    stably sorted by keys[index], which gives an argsort. Only the indices
+    move during the passes.
+
+    :param final_array:     (list) the keys to sort, or indices into keys,
+                            at least two of them
+    :param max_key:         (int) the largest key
+    :param b:               (int) the base, or None to plan one
+    :param keys:            (list) non-negative integer keys, or None
+    :param stats:           (RadixSortStats) receives the statistics of
+                            every pass, or None
+
+    :time complexity:       O((N + b)M), see radix_sort()
+    :space complexity:      O(N + b), see radix_sort()
+    :aux space complexity:  O(N + b), see radix_sort()
+
+    :return:                (list) the sorted keys
+    """
+
+    n = len(final_array)
+
+    if b is None:
+        b = 1 << _plan_radix_bits(n, max_key)
+
+    # power of two bases extract digits with shifts and masks
+    if b & (b - 1) == 0:
+        digit_bits = b.bit_length() - 1
+    else:
+        digit_bits = 0
+    mask = b - 1
+
+    # other_array receives the scatter of each pass, then swaps with
+    # final_array
+    other_array = [None] * n
+    count_array = array("l")
+
+    if stats is not None:
+        stats.start(n, b, max_key)
+
+    # divisor is b ** col, kept up to date instead of recomputed per item
     col = 0
+    divisor = 1
 
-    while not done:
+    while divisor <= max_key:
+        shift = col * digit_bits
+        if stats is not None:
+            pass_start = timeit.default_timer()
 
-        # initialise count_array with separate chaining
+        # clear count_array
         # complexity: O(b)
-        count_array = [None] * (b + 1)
-        for i in range(len(count_array)):
-            count_array[i] = []
+        count_array = array("l", bytes(count_array.itemsize * b))
 
-        # update count_array with separate chaining
+        # count the digits
         # complexity: O(N)
-        max_integer_div = 0
-        for item in final_array:
-            curr = (item // b ** col)
-            if curr > max_integer_div:
-                max_integer_div = curr
-            curr_digit = curr % b
-            count_array[curr_digit].append(item)
-
-        # check if you should break out of loop
-        # i.e. check if you are done checking all the columns
-        if max_integer_div == 0:
-            done = True
-            break
+        if keys is None:
+            column = final_array
+        else:
+            column = map(keys.__getitem__, final_array)
+        if digit_bits:
+            for key in column:
+                count_array[(key >> shift) & mask] += 1
+        else:
+            for key in column:
+                count_array[(key // divisor) % b] += 1
 
-        # update final_array
-        # complexity: O(b + N), outer loop will iterate b times and inner
-        # loop will iterate at most N times.
-        index = 0
-        for i in range(len(count_array)):
-            item_pos = 0
-            frequency = len(count_array[i])
-            for j in range(frequency):
-                final_array[index] = count_array[i][item_pos]
-                index += 1
-                item_pos += 1
+        if stats is not None:
+            histogram = count_array.tolist()
+
+        # a column where every key has the same digit leaves the order as
+        # it is, so its prefix sum and scatter are skipped
+        if keys is None:
+            first_key = final_array[0]
+        else:
+            first_key = keys[final_array[0]]
+        if digit_bits:
+            first_digit = (first_key >> shift) & mask
+        else:
+            first_digit = (first_key // divisor) % b
+        moved = 0 if count_array[first_digit] == n else n
+
+        if moved:
+            # prefix sum, count_array[d] becomes the first position of digit d
+            # complexity: O(b)
+            position = 0
+            for i in range(b):
+                frequency = count_array[i]
+                count_array[i] = position
+                position += frequency
+
+            # stable scatter into other_array
+            # complexity: O(N)
+            if keys is not None:
+                column = zip(final_array, map(keys.__getitem__, final_array))
+                if digit_bits:
+                    for item, key in column:
+                        digit = (key >> shift) & mask
+                        other_array[count_array[digit]] = item
+                        count_array[digit] += 1
+                else:
+                    for item, key in column:
+                        digit = (key // divisor) % b
+                        other_array[count_array[digit]] = item
+                        count_array[digit] += 1
+            elif digit_bits:
+                for item in final_array:
+                    digit = (item >> shift) & mask
+                    other_array[count_array[digit]] = item
+                    count_array[digit] += 1
+            else:
+                for item in final_array:
+                    digit = (item // divisor) % b
+                    other_array[count_array[digit]] = item
+                    count_array[digit] += 1
+
+            final_array, other_array = other_array, final_array
+
+        if stats is not None:
+            stats.record_pass(col, timeit.default_timer() - pass_start,
+                              histogram, moved)
 
         # update col variable to check next column
         col += 1
+        divisor *= b
+
+    if stats is not None:
+        stats.finish()
+
+    return final_array
+
+
+def radix_sort_columns(columns, descending=False, b=None):
+    """
+    Return the permutation of row indices that stably sorts a table given as
+    parallel columns, by the first column, then the second, and so on, each
+    ascending or descending. This is what
+    sorted(range(n), key=lambda i: (a[i], b[i], c[i])) gives, without
+    building a tuple key per row.
+
+    As _pre_process() and _radix_sort_alphabet() do for strings, the table
+    is sorted by one stable pass per column, starting from the last column:
+    a stable sort by an earlier column keeps rows that tie on it in the order
+    of the later columns. Each column pass is the argsort of radix_sort()
+    over the permutation so far, and a descending column sorts by its keys
+    subtracted from the largest key, which keeps ties in order.
+
+    :param columns:         (list) the columns, lists or NumPy arrays of
+                            integers or floats, all of the same length
+    :param descending:      (bool or list) whether to sort descending,
+                            either for every column or one flag per column
+    :param b:               (int) the base, or None to plan one per column
+
+    :time complexity:       O(C(N + b)M), where C is the number of columns, N
+                            the number of rows and M the largest number of
+                            digits of a column's keys in base b.
+
+    :space complexity:      O(N + b), one column's keys at a time.
+
+    :aux space complexity:  O(N + b), for the permutation, the scatter buffer
+                            and the keys of one column.
+
+    :return:                (list) the sorting permutation of the rows
+    """
+
+    columns = list(columns)
+    if isinstance(descending, bool):
+        descending = [descending] * len(columns)
+    if len(descending) != len(columns):
+        raise ValueError("expected one descending flag per column")
+
+    n = len(columns[0]) if columns else 0
+    for column in columns:
+        if len(column) != n:
+            raise ValueError("all columns must have the same length")
+
+    index_array = list(range(n))
+    if n < 2:
+        return index_array
+
+    # one stable pass per column, the least significant column first
+    for column, reverse in zip(reversed(columns), reversed(descending)):
+        if np is not None and isinstance(column, np.ndarray):
+            column = column.tolist()
+        keys, max_key, _ = _encode_keys(column, decode=False)
+        if reverse:
+            keys = [max_key - key for key in keys]
+        index_array = _radix_sort_keys(index_array, max_key, b, keys)
+
+    return index_array
+
+
+def counting_sort(num_list):
+    """
+    Sort num_list, a list or NumPy array of integers, with a one-pass
+    counting sort: count how often each value between the smallest and the
+    largest occurs, then write every value out as often as it was counted.
+    This beats radix_sort() whenever the range of values is not much larger
+    than the number of values, since it makes a single pass whatever the
+    size of the keys.
+
+    :param num_list:        (list or ndarray) the integers to sort
+
+    :time complexity:       Best and Worst Case: O(N + R) for an array,
+                            where N is the number of integers and R is the
+                            difference between the largest and the smallest
+                            one, and O(N + D log D) for a list of D distinct
+                            values, which are ordered with the built-in sort.
+
+    :space complexity:      O(N + D)
+
+    :aux space complexity:  O(N + D), for the output and the counts of the D
+                            distinct values.
+
+    :return:                (list or ndarray) the sorted integers, of the
+                            same type as num_list
+    """
+
+    if len(num_list) < 2:
+        return num_list[:]
+
+    if np is not None and isinstance(num_list, np.ndarray):
+        keys = num_list.ravel()
+        smallest = keys.min()
+        # signed and bool keys are widened to int64 before the subtraction,
+        # so the offsets cannot wrap around in a narrow dtype; unsigned keys
+        # cannot go below smallest
+        if keys.dtype.kind == "u":
+            offsets = (keys - smallest).astype(np.int64)
+        else:
+            smallest = np.int64(smallest)
+            offsets = keys.astype(np.int64) - smallest
+        count_array = np.bincount(offsets)
+        values = np.arange(len(count_array), dtype=offsets.dtype)
+        if keys.dtype.kind == "u":
+            values = values.astype(keys.dtype) + smallest
+        else:
+            values = (values + smallest).astype(keys.dtype)
+        return np.repeat(values, count_array)
+
+    # complexity: O(N), counted in C rather than one Python step per value
+    count_array = collections.Counter(num_list)
+
+    # write out the counted values themselves, not ints rebuilt from their
+    # range, so that e.g. bools come back as bools
+    # complexity: O(N + D log D)
+    final_array = []
+    for value in sorted(count_array):
+        final_array.extend(itertools.repeat(value, count_array[value]))
+    return final_array
+
+
+def adaptive_sort(num_list, decisions=None):
+    """
+    Sort num_list with whichever of counting_sort(), the radix engine or
+    timsort (the built-in sort) should be fastest for it, so that callers do
+    not have to know. The choice is made from the size of the input, the
+    range of its values and how presorted a sample of it is:
+
+    1. fewer than _ADAPTIVE_MIN_KEYS values: timsort, which wins on small
+       inputs;
+    2. integers whose range is small next to the number of values (at most
+       N / _COUNTING_LIST_KEYS_PER_VALUE for lists, N for NumPy arrays):
+       counting_sort(), one pass;
+    3. a sample of adjacent pairs that is at least _PRESORTED_FRACTION
+       ascending or descending: timsort, which is linear on long runs;
+    4. NumPy arrays: radix_sort_numpy();
+    5. lists: timsort. On CPython the digit passes of radix_sort() run in
+       Python and lose to timsort at every size the benchmark suite
+       (main()) has measured, so the radix engine is only chosen for lists
+       of at least _ADAPTIVE_LIST_RADIX_MIN_KEYS values, which is None
+       (never) unless benchmark data on the target machine says otherwise.
+
+    The decision and the measurements it was made from are appended to
+    decisions, if given, so that choices can be audited against benchmark
+    results.
+
+    :param num_list:        (list or ndarray) integers or floats to sort
+    :param decisions:       (list) receives one dict per call with the keys
+                            n, kind, span, ascending_fraction and engine, or
+                            None
+
+    :time complexity:       O(N) to measure the input, plus the sort chosen:
+                            O(N + R) for the counting sort, O((N + b)M) for
+                            the radix sort or O(N log N) for timsort.
+
+    :space complexity:      O(N), plus the space of the sort chosen.
+
+    :aux space complexity:  O(S) for a sample of S pairs, plus the auxiliary
+                            space of the sort chosen.
+
+    :return:                (list or ndarray) the sorted numbers, of the same
+                            type as num_list
+    """
+
+    is_array = np is not None and isinstance(num_list, np.ndarray)
+    n = len(num_list)
+    decision = {"n": n, "kind": None, "span": None,
+                "ascending_fraction": None, "engine": "timsort"}
+
+    if n >= _ADAPTIVE_MIN_KEYS:
+        # the kind and the range of the values
+        # complexity: O(N)
+        if is_array:
+            # only integer and float arrays have radix keys, anything else
+            # (e.g. bool) is left to timsort
+            decision["kind"] = {"i": "int", "u": "int", "f": "float"}.get(
+                num_list.dtype.kind, "other")
+            if decision["kind"] == "int":
+                decision["span"] = int(num_list.max()) - int(num_list.min())
+        else:
+            # the set of types is built in C, without a Python step per value
+            types = set(map(type, num_list))
+            if float in types:
+                decision["kind"] = "float"
+            elif types == {int}:
+                decision["kind"] = "int"
+                decision["span"] = max(num_list) - min(num_list)
+            else:
+                # e.g. bools, left to timsort so they come back unchanged
+                decision["kind"] = "other"
+
+        # how many of a sample of adjacent pairs are in ascending order
+        # complexity: O(S)
+        step = max(1, (n - 1) // _ADAPTIVE_SAMPLE_PAIRS)
+        ascending = 0
+        pairs = 0
+        for i in range(0, n - 1, step):
+            if num_list[i] <= num_list[i + 1]:
+                ascending += 1
+            pairs += 1
+        fraction = ascending / pairs
+        decision["ascending_fraction"] = fraction
+
+        if decision["span"] is not None and (
+                decision["span"] <= n if is_array else
+                decision["span"] * _COUNTING_LIST_KEYS_PER_VALUE <= n):
+            decision["engine"] = "counting"
+        elif fraction >= _PRESORTED_FRACTION or \
+                fraction <= 1 - _PRESORTED_FRACTION:
+            decision["engine"] = "timsort"
+        elif decision["kind"] != "other" and (is_array or (
+                _ADAPTIVE_LIST_RADIX_MIN_KEYS is not None and
+                n >= _ADAPTIVE_LIST_RADIX_MIN_KEYS)):
+            decision["engine"] = "radix"
+
+    if decisions is not None:
+        decisions.append(decision)
+
+    engine = decision["engine"]
+    if engine == "counting":
+        return counting_sort(num_list)
+    if engine == "radix":
+        if is_array:
+            return radix_sort_numpy(num_list)
+        return radix_sort(num_list)
+    if is_array:
+        return np.sort(num_list, axis=None, kind="stable")
+    return sorted(num_list)
+
+
+def msd_radix_sort(num_list, b=None, cutoff=None):
+    """
+    Performs most significant digit (MSD) radix sort on num_list (a list of
+    integers or floats) with base b, a power of two. Unlike radix_sort(),
+    which always runs every digit pass of the largest key, the MSD sort only
+    recurses into buckets that still need sorting:
+
+    - a bucket whose keys are all equal is finished straight away,
+    - digits shared by every key of a bucket are skipped, because each
+      bucket is split at the highest bit where its smallest and largest
+      keys differ,
+    - a bucket with at most cutoff keys is finished with Python's built-in
+      sort (timsort), which is faster than more radix passes on few keys.
+
+    So a single huge key costs passes only in its own bucket, and skewed or
+    clustered keys are sorted with far fewer element moves. Negative
+    integers and floats are handled with the transforms of _encode_keys().
+
+    :param num_list:        (list) the numbers to sort
+    :param b:               (int) the base, a power of two, or None for 256
+    :param cutoff:          (int) the largest bucket handed to the built-in
+                            sort, or None for _MSD_CUTOFF
+
+    :time complexity:       Best Case: O(N), where N is the length of
+                            num_list. This occurs when all of the keys are
+                            equal, which is detected after one scan.
+
+                            Worst Case: O((N + b)M), where M is the number of
+                            digits of the largest key in base b. Every level of
+                            the recursion moves each key at most once and
+                            clears one count array per bucket that is split.
+
+    :space complexity:      O(N + bM), where N is the length of num_list.
+
+    :aux space complexity:  O(N + bM). The keys and the scatter buffer of a
+                            bucket take O(N) space and the stack of pending
+                            buckets holds at most b entries per level.
+
+    :return:                (list) the sorted num_list
+    """
+
+    if len(num_list) < 2:
+        return num_list
+
+    if b is None:
+        b = 1 << 8
+    elif b < 2 or b & (b - 1):
+        raise ValueError("msd_radix_sort() requires a power of two base")
+    if cutoff is None:
+        cutoff = _MSD_CUTOFF
+    digit_bits = b.bit_length() - 1
+    mask = b - 1
+
+    final_array, _, codec = _encode_keys(num_list)
+
+    # stack of buckets (lo, hi) still to sort, the whole list to start with
+    stack = [(0, len(final_array))]
+    count_array = array("l")
+
+    while stack:
+        lo, hi = stack.pop()
+        bucket = final_array[lo:hi]
+
+        if hi - lo <= cutoff:
+            bucket.sort()
+            final_array[lo:hi] = bucket
+            continue
+
+        # a bucket of equal keys is already sorted
+        # complexity: O(size of bucket)
+        smallest = min(bucket)
+        largest = max(bucket)
+        if smallest == largest:
+            continue
+
+        # split on the digit ending at the highest bit where the keys differ,
+        # every key of the bucket has the same bits above it
+        shift = max(0, (smallest ^ largest).bit_length() - digit_bits)
+
+        # counting sort of the bucket on that digit
+        # complexity: O(size of bucket + b)
+        count_array = array("l", bytes(count_array.itemsize * b))
+        for key in bucket:
+            count_array[(key >> shift) & mask] += 1
+
+        position = lo
+        for i in range(b):
+            frequency = count_array[i]
+            count_array[i] = position
+            if frequency > 1 and shift > 0:
+                stack.append((position, position + frequency))
+            position += frequency
+
+        for key in bucket:
+            digit = (key >> shift) & mask
+            final_array[count_array[digit]] = key
+            count_array[digit] += 1
+
+    return _decode_keys(final_array, codec)
+
+
+def radix_select(num_list, k, b=None, largest=False, sort=True):
+    """
+    Return the k smallest (or, with largest, the k largest) numbers of
+    num_list without sorting all of them. This is MSD radix selection:
+    after the digit histogram of the candidates, the buckets below the
+    bucket holding the k-th key are taken whole, the buckets above it are
+    dropped, and only the keys of that one bucket stay candidates for the
+    next digit. As in msd_radix_sort(), the digit is taken just below the
+    highest bit where the candidates differ, and the selection ends as soon
+    as the candidates are all equal. Negative integers and floats are
+    handled with the transforms of _encode_keys().
+
+    :param num_list:        (list) the numbers to select from
+    :param k:               (int) how many numbers to return
+    :param b:               (int) the base, a power of two, or None for 256
+    :param largest:         (bool) select the k largest numbers instead
+    :param sort:            (bool) return the numbers sorted, ascending for
+                            the smallest and descending for the largest,
+                            rather than in no particular order
+
+    :time complexity:       O(N + bM) expected for N numbers, where M is the
+                            number of digits of the keys in base b: every
+                            level only goes through the keys of one bucket.
+                            Sorting the result adds the O((k + b)M) of
+                            radix_sort().
+
+    :space complexity:      O(N), for the keys of num_list.
+
+    :aux space complexity:  O(N) for the keys, plus O(k) for the result and
+                            O(b) for the count array.
+
+    :return:                (list) the k smallest or largest numbers
+    """
+
+    n = len(num_list)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    if b is None:
+        b = 1 << 8
+    elif b < 2 or b & (b - 1):
+        raise ValueError("radix_select() requires a power of two base")
+    digit_bits = b.bit_length() - 1
+    mask = b - 1
+
+    candidates, max_key, codec = _encode_keys(num_list)
+    if largest:
+        candidates = [max_key - key for key in candidates]
+
+    # keys known to be among the k smallest, and how many are still needed
+    selected = []
+    need = k
+    while need:
+        if len(candidates) <= need:
+            selected.extend(candidates)
+            break
+
+        smallest = min(candidates)
+        biggest = max(candidates)
+        if smallest == biggest:
+            selected.extend(candidates[:need])
+            break
+        shift = max(0, (smallest ^ biggest).bit_length() - digit_bits)
+
+        # complexity: O(size of candidates + b)
+        count_array = array("l", [0]) * b
+        for key in candidates:
+            count_array[(key >> shift) & mask] += 1
+
+        # the bucket that holds the need-th smallest candidate
+        boundary = 0
+        below = 0
+        while below + count_array[boundary] < need:
+            below += count_array[boundary]
+            boundary += 1
+
+        remaining = []
+        for key in candidates:
+            digit = (key >> shift) & mask
+            if digit < boundary:
+                selected.append(key)
+            elif digit == boundary:
+                remaining.append(key)
+        candidates = remaining
+        need -= below
+
+    if sort and k > 1:
+        selected = _radix_sort_keys(selected, max(selected), None)
+    if largest:
+        selected = [max_key - key for key in selected]
+    return _decode_keys(selected, codec)
+
+
+def parallel_radix_sort(num_list, b=None, processes=None):
+    """
+    Performs radix sort on num_list with a pool of worker processes. The keys
+    are copied into one multiprocessing.shared_memory segment and MSD
+    partitioned in place, each bucket on the digit just below the highest
+    bit where its keys differ, and any bucket of more than N / (P *
+    _PARALLEL_RUNS_PER_PROCESS) distinct keys is split again, so that skewed
+    keys or a single outlier still give balanced tasks. Contiguous runs of
+    buckets are handed to the workers by name and offsets only, and each
+    worker radix sorts its run of the segment in place. Since the buckets
+    are already in order, the segment is sorted once every worker is done,
+    and the keys are never pickled on the way to or from a worker. Threads
+    would not help here because of the GIL.
+
+    Every key must fit in 64 bits once encoded: integers spanning less than
+    2^64, floats, or a NumPy integer or float array with an itemsize of at
+    most 8. A list mixing integers and floats whose keys do not fit, see
+    _encode_keys(), is sorted serially. With NumPy installed the partition
+    and the sorts in the workers are vectorised, see radix_sort_numpy().
+    Inputs shorter than _PARALLEL_MIN_KEYS, or a single process, are sorted
+    serially.
+
+    :param num_list:        (list or ndarray) the numbers to sort
+    :param b:               (int) the base used by the workers, or None to
+                            plan one per partition
+    :param processes:       (int) the number of worker processes, or None for
+                            os.cpu_count()
+
+    :time complexity:       O(N + (N + b)M / P) for N keys on P processes,
+                            where M is the number of digits in base b. The
+                            partition and the copy back take O(N) in the
+                            parent and the digit passes are split between the
+                            workers.
+
+    :space complexity:      O(N), where N is the length of num_list.
+
+    :aux space complexity:  O(N), for the shared segment, the keys in the
+                            parent and the buffers of the workers, each of
+                            which only holds its own partition.
+
+    :return:                (list or ndarray) the sorted numbers, of the same
+                            type as num_list
+    """
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    is_array = np is not None and isinstance(num_list, np.ndarray)
+
+    if processes < 2 or len(num_list) < _PARALLEL_MIN_KEYS:
+        if is_array:
+            return radix_sort_numpy(num_list, b)
+        return radix_sort(num_list, b)
+
+    # map the numbers to unsigned 64-bit keys
+    # complexity: O(N)
+    if is_array:
+        flat = num_list.ravel()
+        if flat.dtype.kind not in "iuf" or flat.dtype.itemsize > 8:
+            raise TypeError("parallel_radix_sort() requires an integer or "
+                            "float array of at most 64 bits")
+        keys, decode = _encode_array_keys(flat)
+        key_dtype = keys.dtype
+        keys = keys.astype(np.uint64)
+        max_key = int(keys.max())
+    else:
+        keys, max_key, codec = _encode_keys(num_list)
+        if max_key > _MASK_64 and codec is not None and \
+                codec[0] == "mixed":
+            # the indices stored below the keys of mixed integers and
+            # floats can take them past 64 bits
+            return radix_sort(num_list, b)
+        if max_key > _MASK_64:
+            raise ValueError("parallel_radix_sort() requires keys that span "
+                             "less than 2^64")
+
+    n = len(keys)
+    partition_bits = 8
+    mask = (1 << partition_bits) - 1
+
+    shm = shared_memory.SharedMemory(create=True, size=8 * n)
+    segment = None
+    try:
+        if is_array:
+            segment = np.ndarray((n,), dtype=np.uint64, buffer=shm.buf)
+            segment[:] = keys
+        else:
+            segment = shm.buf.cast("Q")
+            segment[:] = array("Q", keys)
+        keys = None
+
+        # MSD partition of the segment in place until no bucket holds more
+        # than target keys. Each bucket is split on the digit just below the
+        # highest bit where its keys differ, so one outlier key cannot leave
+        # nearly every key in one bucket
+        # complexity: O(N) per level, and a level only splits the buckets
+        # that are still too big
+        target = -(-n // (processes * _PARALLEL_RUNS_PER_PROCESS))
+        buckets = []
+        pending = [(0, n)]
+        while pending:
+            lo, hi = pending.pop()
+            if hi - lo <= target:
+                buckets.append((lo, hi))
+                continue
+            if is_array:
+                part = segment[lo:hi]
+                smallest = int(part.min())
+                largest = int(part.max())
+            else:
+                part = segment[lo:hi].tolist()
+                smallest = min(part)
+                largest = max(part)
+            if smallest == largest:
+                buckets.append((lo, hi))
+                continue
+            shift = max(0, (smallest ^ largest).bit_length() - partition_bits)
+
+            if is_array:
+                digits = ((part >> np.uint64(shift)) &
+                          np.uint64(mask)).astype(np.uint16)
+                part[:] = part[np.argsort(digits, kind="stable")]
+                bucket_sizes = np.bincount(digits,
+                                           minlength=mask + 1).tolist()
+            else:
+                count_array = array("l", [0]) * (mask + 1)
+                for key in part:
+                    count_array[(key >> shift) & mask] += 1
+                bucket_sizes = count_array.tolist()
+                position = lo
+                for i in range(len(count_array)):
+                    frequency = count_array[i]
+                    count_array[i] = position
+                    position += frequency
+                for key in part:
+                    digit = (key >> shift) & mask
+                    segment[count_array[digit]] = key
+                    count_array[digit] += 1
+            part = None
+
+            start = lo
+            for frequency in bucket_sizes:
+                if frequency:
+                    pending.append((start, start + frequency))
+                start += frequency
+        buckets.sort()
+
+        # group whole buckets into a few runs per process
+        tasks = []
+        start = 0
+        for lo, hi in buckets:
+            if hi - start >= target:
+                tasks.append((shm.name, start, hi, b))
+                start = hi
+        if start < n:
+            tasks.append((shm.name, start, n, b))
+
+        with multiprocessing.Pool(min(processes, len(tasks))) as pool:
+            pool.starmap(_sort_shared_partition, tasks)
+
+        # copy the sorted keys out of the segment and decode them
+        # complexity: O(N)
+        if is_array:
+            final_array = segment.astype(key_dtype)
+            if decode is not None:
+                final_array = decode(final_array)
+        else:
+            final_array = _decode_keys(segment.tolist(), codec)
+    finally:
+        # every view of the segment has to be gone before it is closed
+        if not is_array and segment is not None:
+            segment.release()
+        segment = None
+        shm.close()
+        shm.unlink()
+
+    return final_array
+
+
+def _sort_shared_partition(name, start, stop, b):
+    """
+    Worker of parallel_radix_sort(). Attach to the shared memory segment
+    called name and radix sort the unsigned 64-bit keys in [start, stop) in
+    place.
+
+    :param name:            (str) the name of the shared memory segment
+    :param start:           (int) the index of the first key of the partition
+    :param stop:            (int) one past the index of the last key
+    :param b:               (int) the base, or None to plan one
+
+    :time complexity:       O((K + b)M), where K = stop - start and M is the
+                            number of digits of the largest key in base b.
+    :space complexity:      O(K + b)
+    :aux space complexity:  O(K + b), for the sort of the partition.
+
+    :return:                None
+    """
+
+    shm = shared_memory.SharedMemory(name=name)
+    part = None
+    try:
+        if np is not None:
+            part = np.ndarray((stop - start,), dtype=np.uint64,
+                              buffer=shm.buf, offset=8 * start)
+            part[:] = radix_sort_numpy(part, b)
+        else:
+            part = shm.buf.cast("Q")[start:stop]
+            part[:] = array("Q", radix_sort(part.tolist(), b))
+    finally:
+        if np is None and part is not None:
+            part.release()
+        part = None
+        shm.close()
+
+
+def external_radix_sort(in_path, out_path, b=None, memory_budget=None,
+                        tmp_dir=None):
+    """
+    Sort a binary file of packed unsigned 64-bit keys (native byte order)
+    that may be larger than memory, writing the sorted keys to out_path.
+
+    This is an MSD radix sort over files. The input is streamed in chunks
+    that fit the memory budget and each key is appended to one of 256 spill
+    files chosen by its most significant byte. The chunk is distributed into
+    in-memory buffers first, so the spill files only receive bulk writes.
+    Then, in digit order, every spill file that fits in the budget is
+    memory-mapped and sorted in memory with radix_sort() (or
+    radix_sort_numpy() if NumPy is installed), and every file that is still
+    too large is distributed again on its next byte.
+
+    :param in_path:         (str) the file of packed keys to sort
+    :param out_path:        (str) the file to write the sorted keys to
+    :param b:               (int) the base of the in-memory sorts, or None to
+                            plan one
+    :param memory_budget:   (int) roughly how many bytes of keys may be held
+                            in memory at once, or None for
+                            _EXTERNAL_MEMORY_BUDGET
+    :param tmp_dir:         (str) where to create the spill files, or None
+                            for the default temporary directory
+
+    :time complexity:       O(N(D + M)), where N is the number of keys, D is
+                            the number of distribution levels needed before
+                            the buckets fit in the budget (at most 8) and M is
+                            the number of digits of the in-memory sorts. Each
+                            level reads and writes every key once.
+
+    :space complexity:      O(N) on disk for the spill files of each open
+                            level, O(B) in memory for a budget of B bytes.
+
+    :aux space complexity:  O(B) in memory: one chunk of the input and the
+                            spill buffers, which together never hold more
+                            keys than the chunk.
+
+    :return:                (int) the number of keys written to out_path
+    """
+
+    if memory_budget is None:
+        memory_budget = _EXTERNAL_MEMORY_BUDGET
+
+    size = os.path.getsize(in_path)
+    if size % 8:
+        raise ValueError("%s does not hold whole 64-bit keys" % in_path)
+
+    # a chunk and its spill buffers hold two copies of the keys, and Python
+    # ints take several times the 8 bytes of a packed key
+    if np is not None:
+        budget_keys = max(1, memory_budget // _NUMPY_KEY_BYTES)
+    else:
+        budget_keys = max(1, memory_budget // (2 * _PYTHON_KEY_BYTES))
+
+    with open(out_path, "wb") as out_file:
+        _external_sort_file(in_path, out_file, 64 - 8, b, budget_keys,
+                            tmp_dir)
+
+    return size // 8
+
+
+def _external_sort_file(path, out_file, shift, b, budget_keys, tmp_dir):
+    """
+    Append the keys of the file at path to out_file in sorted order. Every
+    key of the file has the same bits above shift + 8. Files of at most
+    budget_keys keys are sorted in memory, larger ones are distributed into
+    spill files on the byte at shift, which are sorted recursively.
+
+    :param path:            (str) the file of packed keys
+    :param out_file:        (file) the binary file to append to
+    :param shift:           (int) the position of the byte to distribute on
+    :param b:               (int) the base of the in-memory sorts, or None
+    :param budget_keys:     (int) the most keys to hold in memory at once
+    :param tmp_dir:         (str) where to create the spill files, or None
+
+    :time complexity:       see external_radix_sort()
+    :space complexity:      see external_radix_sort()
+    :aux space complexity:  see external_radix_sort()
+
+    :return:                None
+    """
+
+    n = os.path.getsize(path) // 8
+    if n == 0:
+        return
+
+    # every key of the file is equal once all of its bytes are used
+    if shift < 0:
+        with open(path, "rb") as in_file:
+            shutil.copyfileobj(in_file, out_file)
+        return
+
+    if n <= budget_keys:
+        with open(path, "rb") as in_file, \
+                mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if np is not None:
+                keys = np.frombuffer(mm, dtype=np.uint64)
+                final_array = radix_sort_numpy(keys, b)
+                keys = None
+                out_file.write(final_array.data)
+            else:
+                keys = memoryview(mm).cast("Q")
+                final_array = keys.tolist()
+                keys.release()
+                array("Q", radix_sort(final_array, b)).tofile(out_file)
+        return
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as spill_dir:
+        spill_files = [None] * 256
+
+        # distribute the file chunk by chunk into the spill files
+        # complexity: O(N)
+        with open(path, "rb") as in_file:
+            while True:
+                data = in_file.read(8 * budget_keys)
+                if not data:
+                    break
+                for digit, run in _spill_runs(data, shift):
+                    if spill_files[digit] is None:
+                        # unbuffered, the runs already are bulk writes
+                        spill_files[digit] = open(
+                            os.path.join(spill_dir, "%03d" % digit), "wb",
+                            buffering=0)
+                    spill_files[digit].write(run)
+                # let go of this chunk before the next one is read
+                data = run = None
+
+        for spill_file in spill_files:
+            if spill_file is not None:
+                spill_file.close()
+
+        # sort the spill files in digit order, removing each once done
+        for digit in range(256):
+            if spill_files[digit] is not None:
+                spill_path = spill_files[digit].name
+                _external_sort_file(spill_path, out_file, shift - 8, b,
+                                    budget_keys, tmp_dir)
+                os.remove(spill_path)
+
+
+def _spill_runs(data, shift):
+    """
+    Split data, a bytes object of packed 64-bit keys, by the byte of each key
+    at shift. Return (digit, packed keys) pairs, one per digit that occurs,
+    with the keys of each digit in their original order.
+
+    :param data:            (bytes) packed unsigned 64-bit keys
+    :param shift:           (int) the position of the byte to split on
+
+    :time complexity:       O(N), where N is the number of keys in data.
+    :space complexity:      O(N)
+    :aux space complexity:  O(N), for the buffers of the digits.
+
+    :return:                (list) of (int, bytes-like) pairs, the keys
+                            being bytes or, with NumPy, views of one
+                            reordered array
+    """
+
+    if np is not None:
+        keys = np.frombuffer(data, dtype=np.uint64)
+        digits = keys >> shift
+        digits &= 255
+        digits = digits.astype(np.uint8)
+        # free each temporary as soon as it is used, these arrays are what
+        # _NUMPY_KEY_BYTES accounts for
+        order = np.argsort(digits, kind="stable")
+        keys = keys[order]
+        order = None
+        runs = []
+        start = 0
+        for digit, frequency in enumerate(np.bincount(digits,
+                                                      minlength=256)):
+            if frequency:
+                runs.append((digit, keys[start:start + frequency].data))
+                start += frequency
+        return runs
+
+    keys = array("Q")
+    keys.frombytes(data)
+    buffers = [None] * 256
+    for key in keys:
+        digit = (key >> shift) & 255
+        if buffers[digit] is None:
+            buffers[digit] = array("Q")
+        buffers[digit].append(key)
+    return [(digit, buffers[digit].tobytes()) for digit in range(256)
+            if buffers[digit] is not None]
+
+
+def american_flag_sort(buffer, b=None, cutoff=None):
+    """
+    Sort buffer in place with American flag sort, the in-place form of
+    MSD radix sort. buffer can be any writable, C-contiguous object that
+    exposes the buffer protocol with an integer format, such as an
+    array.array, a bytearray, a NumPy integer array or a memoryview of one.
+    It is sorted through a memoryview, so the caller's memory is permuted
+    directly and never copied.
+
+    For each bucket the digits are counted once, and then every key is
+    swapped straight to the next free slot of its digit's bucket, following
+    cycles until a key of the current bucket turns up. As in
+    msd_radix_sort(), a bucket of equal keys is finished straight away, the
+    digit is taken just below the highest bit where the keys of the bucket
+    differ, and a bucket of at most cutoff keys is finished with the built-in
+    sort.
+
+    :param buffer:          a writable buffer of integers
+    :param b:               (int) the base, a power of two, or None for 256
+    :param cutoff:          (int) the largest bucket handed to the built-in
+                            sort, or None for _MSD_CUTOFF
+
+    :time complexity:       Best Case: O(N), where N is the number of items
+                            in buffer, when all of the keys are equal.
+
+                            Worst Case: O((N + b)M), where M is the number of
+                            digits of the keys in base b. Each level of the
+                            recursion counts and moves every key once.
+
+    :space complexity:      O(N + bM)
+
+    :aux space complexity:  O(bM): the stack of pending buckets holds at
+                            most b of them per level, the count and bucket
+                            bound arrays of the bucket being split take O(b)
+                            and the built-in sort copies at most cutoff keys.
+
+    :return:                None
+    """
+
+    view = memoryview(buffer)
+    if view.readonly:
+        raise TypeError("american_flag_sort() requires a writable buffer")
+    item_format = view.format.lstrip("@")
+    if item_format not in _BUFFER_INTEGER_FORMATS:
+        raise TypeError("american_flag_sort() cannot sort items of format %r"
+                        % view.format)
+    if not view.c_contiguous:
+        raise ValueError("american_flag_sort() requires a contiguous buffer")
+    view = view.cast("B").cast(item_format)
+
+    if b is None:
+        b = 1 << 8
+    elif b < 2 or b & (b - 1):
+        raise ValueError("american_flag_sort() requires a power of two base")
+    if cutoff is None:
+        cutoff = _MSD_CUTOFF
+    digit_bits = b.bit_length() - 1
+    mask = b - 1
+
+    # signed items are offset so that their keys are non-negative
+    if item_format.islower():
+        offset = 1 << (8 * view.itemsize - 1)
+    else:
+        offset = 0
+
+    stack = [(0, len(view))]
+    while stack:
+        lo, hi = stack.pop()
+
+        if hi - lo <= cutoff:
+            view[lo:hi] = array(item_format, sorted(view[lo:hi]))
+            continue
+
+        smallest = min(view[lo:hi]) + offset
+        largest = max(view[lo:hi]) + offset
+        if smallest == largest:
+            continue
+        shift = max(0, (smallest ^ largest).bit_length() - digit_bits)
+
+        # count the digits of the bucket
+        # complexity: O(size of bucket + b)
+        count_array = array("l", [0]) * b
+        for i in range(lo, hi):
+            count_array[((view[i] + offset) >> shift) & mask] += 1
+
+        # heads[d] is the next free slot of digit d's bucket and ends[d] is
+        # one past its last slot
+        heads = array("l", [0]) * b
+        ends = array("l", [0]) * b
+        position = lo
+        for digit in range(b):
+            heads[digit] = position
+            position += count_array[digit]
+            ends[digit] = position
+            if count_array[digit] > 1 and shift > 0:
+                stack.append((heads[digit], position))
+
+        # permute the bucket in place, cycle by cycle
+        # complexity: O(size of bucket)
+        for digit in range(b):
+            i = heads[digit]
+            end = ends[digit]
+            while i < end:
+                value = view[i]
+                value_digit = ((value + offset) >> shift) & mask
+                while value_digit != digit:
+                    j = heads[value_digit]
+                    heads[value_digit] = j + 1
+                    value, view[j] = view[j], value
+                    value_digit = ((value + offset) >> shift) & mask
+                view[i] = value
+                i += 1
+            heads[digit] = end
+
+
+def iter_radix_sort(iterable, chunk_size=None, b=None, key=None,
+                    max_runs_in_memory=None, tmp_dir=None):
+    """
+    Sort the numbers (or, with key, the items) of iterable and yield them in
+    order. This is for inputs that arrive from a generator and cannot be
+    handed to radix_sort() as a list. The input is pulled in chunks of
+    chunk_size items, each chunk is sorted with radix_sort() into a sorted
+    run, and the runs are combined with a heap-based k-way merge
+    (heapq.merge) on _radix_order() of the keys, so the result is in the
+    same order as radix_sort() gives, NaNs last and -0.0 before 0.0. Items
+    with equal keys keep the order they arrived in.
+
+    If max_runs_in_memory is given, any run beyond that many is pickled in
+    batches to an anonymous temporary file and read back lazily during the
+    merge, so memory holds at most max_runs_in_memory runs plus one batch per
+    spilled run.
+
+    :param iterable:        the numbers or items to sort
+    :param chunk_size:      (int) the number of items per sorted run, or None
+                            for _STREAM_CHUNK_SIZE
+    :param b:               (int) the base, or None to plan one per run
+    :param key:             (function) maps an item to its sort key, or None
+    :param max_runs_in_memory: (int) the most runs to keep in memory, or None
+                            to keep all of them
+    :param tmp_dir:         (str) where to create the spill files, or None
+                            for the default temporary directory
+
+    :time complexity:       O(N(M + log R)), where N is the number of items,
+                            M is the number of digit passes of a chunk and R
+                            is the number of runs. Each chunk is radix sorted
+                            and each item then passes through a heap of R
+                            runs.
+
+    :space complexity:      O(N) if every run stays in memory, otherwise
+                            O(CK + R) in memory for chunks of C items with at
+                            most K runs in memory.
+
+    :aux space complexity:  same as the space complexity, the items are only
+                            ever held by the runs.
+
+    :return:                (generator) the items in sorted order
+    """
+
+    if chunk_size is None:
+        chunk_size = _STREAM_CHUNK_SIZE
+
+    iterator = iter(iterable)
+    runs = []
+    spill_files = []
+    try:
+        while True:
+            chunk = list(itertools.islice(iterator, chunk_size))
+            if not chunk:
+                break
+            # each item is kept next to its merge key, so key is called once
+            # per item and the merge follows the order of radix_sort()
+            # complexity: O(C) calls to key for a chunk of C items
+            keys = chunk if key is None else [key(item) for item in chunk]
+            run = [(_radix_order(keys[i]), chunk[i])
+                   for i in radix_sort(keys, b, argsort=True)]
+
+            if max_runs_in_memory is not None and \
+                    len(runs) - len(spill_files) >= max_runs_in_memory:
+                spill_file = tempfile.TemporaryFile(dir=tmp_dir)
+                for start in range(0, len(run), _SPILL_BATCH_SIZE):
+                    pickle.dump(run[start:start + _SPILL_BATCH_SIZE],
+                                spill_file, pickle.HIGHEST_PROTOCOL)
+                spill_files.append(spill_file)
+                run = _read_spilled_run(spill_file)
+            runs.append(run)
+
+        for _, item in heapq.merge(*runs, key=operator.itemgetter(0)):
+            yield item
+    finally:
+        for spill_file in spill_files:
+            spill_file.close()
+
+
+def _radix_order(value):
+    """
+    Return a key under which Python's comparisons order numbers the way
+    radix_sort() does, for merging runs that radix_sort() has sorted. Plain
+    < does not: NaN compares false with everything and -0.0 equals 0.0,
+    whereas radix_sort() puts every NaN last and -0.0 before 0.0.
+
+    :param value:           (int or float) the sort key of an item
+
+    :time complexity:       O(1)
+    :space complexity:      O(1)
+    :aux space complexity:  O(1)
+
+    :return:                (tuple) the merge key
+    """
+
+    if isinstance(value, float):
+        if value != value:
+            return (1, 0, True)
+        return (0, value, math.copysign(1.0, value) > 0)
+    return (0, value, True)
+
+
+def _read_spilled_run(spill_file):
+    """
+    Yield the items of a run that iter_radix_sort() pickled to spill_file,
+    one batch at a time.
+
+    :param spill_file:      (file) the binary file holding the pickled batches
+
+    :time complexity:       O(K), where K is the number of items in the run.
+    :space complexity:      O(K) on disk.
+    :aux space complexity:  O(_SPILL_BATCH_SIZE), for the batch being read.
+
+    :return:                (generator) the items of the run in order
+    """
+
+    spill_file.seek(0)
+    while True:
+        try:
+            batch = pickle.load(spill_file)
+        except EOFError:
+            return
+        yield from batch
+
+
+class RadixSortStats:
+    """
+    Statistics of the digit passes of one radix_sort() or radix_sort_numpy()
+    call, for finding out why a sort is slow: too many passes, a lopsided
+    bucket distribution, or time spent outside the passes. Pass an instance
+    as the stats argument of the sort. To be called back as the sort
+    progresses instead, subclass it and extend record_pass() or finish().
+    An instance can be reused; each sort starts from scratch.
+
+    == Attributes ==
+    passes:     (list) one dict per digit pass, with the keys pass (its
+                number, least significant first), seconds (its wall time),
+                histogram (how many keys had each digit value),
+                occupied_buckets, max_bucket and moved (how many keys were
+                scattered)
+    summary:    (dict) set when the sort finishes, with the keys n, base,
+                max_key, passes, seconds (the wall time of the whole sort),
+                pass_seconds and moved
+    """
+
+    def __init__(self):
+        """
+        Initialise empty statistics.
+
+        :time complexity:       O(1)
+        :space complexity:      O(1)
+        :aux space complexity:  O(1)
+
+        :return:                None
+        """
+        self.passes = []
+        self.summary = None
+        self._n = 0
+        self._b = 0
+        self._max_key = 0
+        self._start = 0.0
+
+    def start(self, n, b, max_key):
+        """
+        Called by the sort before its first pass.
+
+        :param n:               (int) the number of keys
+        :param b:               (int) the base
+        :param max_key:         (int) the largest key
+
+        :time complexity:       O(1)
+        :space complexity:      O(1)
+        :aux space complexity:  O(1)
+
+        :return:                None
+        """
+        self.passes = []
+        self.summary = None
+        self._n = n
+        self._b = b
+        self._max_key = max_key
+        self._start = timeit.default_timer()
+
+    def record_pass(self, col, seconds, histogram, moved):
+        """
+        Called by the sort after every digit pass.
+
+        :param col:             (int) the number of the pass
+        :param seconds:         (float) the wall time of the pass
+        :param histogram:       (list) how many keys had each digit value
+        :param moved:           (int) how many keys were scattered
+
+        :time complexity:       O(b), where b is the length of histogram.
+        :space complexity:      O(b)
+        :aux space complexity:  O(1), the histogram is kept as given.
+
+        :return:                None
+        """
+        occupied = 0
+        for frequency in histogram:
+            if frequency:
+                occupied += 1
+        self.passes.append({
+            "pass": col,
+            "seconds": seconds,
+            "histogram": histogram,
+            "occupied_buckets": occupied,
+            "max_bucket": max(histogram, default=0),
+            "moved": moved,
+        })
+
+    def finish(self):
+        """
+        Called by the sort after its last pass, fills in summary.
+
+        :time complexity:       O(P), where P is the number of passes.
+        :space complexity:      O(1)
+        :aux space complexity:  O(1)
+
+        :return:                None
+        """
+        self.summary = {
+            "n": self._n,
+            "base": self._b,
+            "max_key": self._max_key,
+            "passes": len(self.passes),
+            "seconds": timeit.default_timer() - self._start,
+            "pass_seconds": sum(record["seconds"] for record in self.passes),
+            "moved": sum(record["moved"] for record in self.passes),
+        }
+
+
+def _encode_keys(values, decode=True):
+    """
+    Return a new list of non-negative integer keys that sort in the same
+    order as values, the largest key, and the codec that _decode_keys()
+    needs to map sorted keys back to values.
+
+    - Integers are keyed by their distance from the smallest value (codec
+      ("int", smallest)). For negative 64-bit values this is the same order
+      as flipping the sign bit, but it works for Python integers of any
+      size, and for clustered keys such as timestamps it removes the high
+      bits that every key shares, so fewer digit passes are needed. Values
+      whose range needs as many bits as their largest value are their own
+      keys (codec None).
+    - If any value is a float, every value is converted to float64 and its
+      bit pattern is used (codec ("float", smallest key)). Positive floats
+      get the sign bit set and negative floats have all of their bits
+      inverted, so the keys follow the IEEE-754 total order: -inf < ... <
+      -0.0 < 0.0 < ... < inf. Every NaN is given the largest key, so NaNs
+      come last. The keys are then reduced by their smallest key in the same
+      way as integers.
+    - If the floats are mixed with integers, the float64 keys are shifted
+      left by enough bits to hold the index of each value, which is stored
+      below them (codec ("mixed", index bits, values)). Equal keys keep
+      their order in values, and _decode_keys() returns the original values
+      rather than floats. Callers that only order by the keys and never
+      decode them pass decode=False and get the float64 keys alone, so
+      equal values have equal keys. An integer that float64 cannot represent
+      exactly would be ordered by a rounded key, so it raises a ValueError.
+
+    :param values:          (list) integers or floats, at least one
+    :param decode:          (bool) whether the keys will be mapped back with
+                            _decode_keys()
+
+    :time complexity:       O(N), where N is the length of values. Detecting
+                            floats, finding the minimum and maximum and
+                            building the keys are each one pass over the
+                            list.
+    :space complexity:      O(N), where N is the length of values.
+    :aux space complexity:  O(N), for the list of keys.
+
+    :return:                (tuple) (keys, max_key, codec)
+    """
+
+    if any(isinstance(value, float) for value in values):
+        mixed = not all(isinstance(value, float) for value in values)
+        if mixed:
+            for value in values:
+                if isinstance(value, float):
+                    continue
+                try:
+                    exact = float(value) == value
+                except OverflowError:
+                    exact = False
+                if not exact:
+                    raise ValueError("%r cannot be sorted with floats, "
+                                     "float64 does not represent it "
+                                     "exactly" % value)
+
+        # reinterpret the float64 bit patterns as unsigned 64-bit integers
+        bits = array("Q")
+        bits.frombytes(array("d", values).tobytes())
+        keys = [_FLOAT_NAN_KEY if value != value
+                else key ^ _MASK_64 if key >> 63 else key | _SIGN_BIT_64
+                for value, key in zip(values, bits)]
+        smallest = min(keys)
+        largest = max(keys)
+        if mixed and decode:
+            index_bits = (len(keys) - 1).bit_length()
+            keys = [(key - smallest) << index_bits | i
+                    for i, key in enumerate(keys)]
+            return keys, max(keys), ("mixed", index_bits, values)
+        if (largest - smallest).bit_length() < largest.bit_length():
+            keys = [key - smallest for key in keys]
+            return keys, largest - smallest, ("float", smallest)
+        return keys, largest, ("float", 0)
+
+    smallest = min(values)
+    largest = max(values)
+    if smallest >= 0 and \
+            (largest - smallest).bit_length() == largest.bit_length():
+        return list(values), largest, None
+
+    keys = [value - smallest for value in values]
+    return keys, largest - smallest, ("int", smallest)
+
+
+def _decode_keys(keys, codec):
+    """
+    Map keys produced by _encode_keys() back to the values they came from.
+    Keys of a list that mixes integers and floats give back the original
+    values themselves.
+    NaNs come back as a quiet NaN, not with their original bit patterns.
+
+    :param keys:            (list) the keys, in any order
+    :param codec:           (tuple) the codec returned by _encode_keys()
+
+    :time complexity:       O(N), where N is the length of keys.
+    :space complexity:      O(N), where N is the length of keys.
+    :aux space complexity:  O(N), for the decoded list, or O(1) if the keys
+                            are the values.
+
+    :return:                (list) the values in the order of keys
+    """
+
+    if codec is None:
+        return keys
+
+    if codec[0] == "mixed":
+        _, index_bits, values = codec
+        mask = (1 << index_bits) - 1
+        return [values[key & mask] for key in keys]
+
+    kind, smallest = codec
+    if kind == "int":
+        return [key + smallest for key in keys]
+
+    bits = array("Q")
+    for key in keys:
+        key += smallest
+        bits.append(key ^ _SIGN_BIT_64 if key >> 63 else key ^ _MASK_64)
+    values = array("d")
+    values.frombytes(bits.tobytes())
+    return values.tolist()
+
+
+def _plan_radix_bits(n, max_key):
+    """
+    Return the number of bits per digit to radix sort n keys whose largest
+    value is max_key. The digit is made as wide as allowed, which gives the
+    fewest passes, and then the key bits are spread evenly over those passes.
+    A digit is never wider than _MAX_DIGIT_BITS, so that the count array
+    stays cache resident, nor much wider than log2(n), since a count array
+    larger than the input costs more to clear and scan than it saves.
+
+    :param n:               (int) the number of keys to sort
+    :param max_key:         (int) the largest key, non-negative
+
+    :time complexity:       O(1)
+    :space complexity:      O(1)
+    :aux space complexity:  O(1)
+
+    :return:                (int) the digit width in bits, at least 1
+    """
+
+    key_bits = max(max_key.bit_length(), 1)
+    widest = max(1, min(_MAX_DIGIT_BITS, n.bit_length()))
+
+    # fewest passes allowed by the widest digit, then the narrowest digit
+    # that still finishes in that many passes
+    passes = -(-key_bits // widest)
+    return -(-key_bits // passes)
+
+
+def radix_sort_numpy(num_array, b=None, argsort=False, stats=None):
+    """
+    Performs radix sort on num_array (a NumPy array of integers or floats)
+    with base b. This is the vectorised counterpart of radix_sort(): every
+    digit pass is done with whole-array operations instead of Python-level
+    bucket lists, and the result is identical to radix_sort() on the same
+    keys. Signed and floating point arrays are sorted through the
+    order-preserving transforms of _encode_array_keys(). With argsort, the
+    stable permutation that sorts num_array is returned instead, so that
+    parallel arrays can be reordered with it.
+
+    :precondition:          NumPy is installed.
+    :param num_array:       (ndarray) the numbers to sort, any integer or
+                            floating point dtype of at most 64 bits
+    :param b:               (int) the base to sort the numbers to, or None
+                            to plan a power of two base as radix_sort() does
+    :param argsort:         (bool) return the sorting permutation instead of
+                            the sorted array
+    :param stats:           (RadixSortStats) receives the statistics of
+                            every digit pass, see radix_sort(), or None
+
+    :time complexity:       Best and Worst Case: O((N + b)M), where N is the
+                            number of integers in num_array, b is the base and
+                            M is the number of digits in the largest number
+                            in base b. Each pass extracts the digit column with
+                            a shift and a mask when b is a power of two, or a
+                            floor division and a modulo otherwise, and performs
+                            a stable scatter on it. For bases up to 2^16 the
+                            digit column is stored as uint8 or uint16, which
+                            NumPy's stable argsort handles with a counting
+                            sort, so each pass stays O(N + b).
+
+    :space complexity:      O(N), where N is the length of num_array.
+
+    :aux space complexity:  O(N), for the output array, the digit column and
+                            the permutation of one pass.
+
+    :return:                (ndarray) a new sorted array with the dtype of
+                            num_array, or the sorting permutation (intp) if
+                            argsort is set
+    """
+
+    if np is None:
+        raise ImportError("radix_sort_numpy() requires NumPy")
+
+    keys = np.asarray(num_array).ravel()
+    if keys.dtype.kind not in "iuf" or keys.dtype.itemsize > 8:
+        raise TypeError("radix_sort_numpy() requires an integer or float "
+                        "array of at most 64 bits")
+
+    # boundary cases, an empty array and an array with one number are
+    # already sorted
+    if len(keys) < 2:
+        if stats is not None:
+            stats.start(len(keys), b, 0)
+            stats.finish()
+        if argsort:
+            return np.arange(len(keys))
+        return keys.copy()
+
+    keys, decode = _encode_array_keys(keys)
+
+    # sort the distance from the smallest key, which drops the high bits
+    # that every key shares
+    smallest = keys.min()
+    if smallest:
+        keys = keys - smallest
+
+    max_key = int(keys.max())
+    if b is None:
+        b = 1 << _plan_radix_bits(len(keys), max_key)
+
+    # pick the smallest digit dtype so that the stable argsort below runs
+    # as a counting sort
+    if b <= 1 << 8:
+        digit_dtype = np.uint8
+    elif b <= 1 << 16:
+        digit_dtype = np.uint16
+    else:
+        digit_dtype = keys.dtype
+
+    # power of two bases extract digits with shifts and masks
+    if b & (b - 1) == 0:
+        digit_bits = b.bit_length() - 1
+    else:
+        digit_bits = 0
+
+    # keys is already a new array unless it is num_array itself
+    final_array = keys if smallest or decode is not None else keys.copy()
+    keys = None
+    # the permutation is only carried through the passes when asked for
+    index_array = np.arange(len(final_array)) if argsort else None
+    col = 0
+    divisor = 1
+
+    if stats is not None:
+        stats.start(len(final_array), b, max_key)
+
+    # complexity: O(M) passes of O(N + b) each
+    while divisor <= max_key:
+        if stats is not None:
+            pass_start = timeit.default_timer()
+        if digit_bits:
+            quotient = final_array >> (col * digit_bits)
+        else:
+            quotient = final_array // divisor
+
+        # the mask or modulo is only needed while b fits in the key range,
+        # otherwise the quotient already is the digit
+        if b <= max_key:
+            if digit_bits:
+                quotient &= b - 1
+            else:
+                quotient %= b
+        digits = quotient.astype(digit_dtype, copy=False)
+        # only the digits are needed from here on, free the quotient
+        quotient = None
+
+        # stable scatter of the whole array by the current digit, unless
+        # every key has the same digit
+        moved = 0
+        if digits.min() != digits.max():
+            order = np.argsort(digits, kind="stable")
+            final_array = final_array[order]
+            if argsort:
+                index_array = index_array[order]
+            moved = len(final_array)
+
+        if stats is not None:
+            # bases above 2^16 only report the digits that occur
+            if b <= 1 << 16:
+                histogram = np.bincount(digits, minlength=b).tolist()
+            else:
+                histogram = np.unique(digits, return_counts=True)[1].tolist()
+            stats.record_pass(col, timeit.default_timer() - pass_start,
+                              histogram, moved)
+
+        col += 1
+        divisor *= b
+
+    if stats is not None:
+        stats.finish()
+
+    if argsort:
+        return index_array
+    if smallest:
+        final_array += smallest
+    if decode is not None:
+        return decode(final_array)
+    return final_array
+
+
+def _encode_array_keys(keys):
+    """
+    Return an unsigned integer array that sorts in the same order as keys,
+    and a function that maps a sorted key array back to the dtype of keys
+    (None if keys is already unsigned). This is the array form of
+    _encode_keys(): signed integers have their sign bit flipped, and floats
+    have the sign bit set when positive or all bits inverted when negative,
+    with every NaN mapped to the largest key.
+
+    :param keys:            (ndarray) a contiguous 1-D integer or float array
+                            of at most 64 bits
+
+    :time complexity:       O(N), where N is the length of keys.
+    :space complexity:      O(N), where N is the length of keys.
+    :aux space complexity:  O(N), for the transformed array.
+
+    :return:                (tuple) (unsigned keys, decode function or None)
+    """
+
+    if keys.dtype.kind == "u":
+        return keys, None
+
+    dtype = keys.dtype
+    unsigned = np.dtype("u%d" % dtype.itemsize)
+    sign_bit = unsigned.type(1 << (8 * dtype.itemsize - 1))
+    bits = keys.view(unsigned)
+
+    if dtype.kind == "i":
+        return bits ^ sign_bit, lambda sorted_keys: (
+            (sorted_keys ^ sign_bit).view(dtype))
+
+    encoded = np.where(bits & sign_bit, ~bits, bits | sign_bit)
+    encoded[np.isnan(keys)] = ~unsigned.type(0)
+
+    def decode(sorted_keys):
+        return np.where(sorted_keys & sign_bit, sorted_keys ^ sign_bit,
+                        ~sorted_keys).view(dtype)
+
+    return encoded, decode
+
+
+def radix_sort_records(buffer, record_width, key_offset, key_length,
+                       in_place=False, byteorder="big"):
+    """
+    Sort fixed-width binary records by a key held in their bytes, without
+    unpacking them. buffer is a bytes-like object (bytes, bytearray,
+    memoryview, array.array) or a NumPy array, e.g. a structured array, and
+    is read as consecutive records of record_width bytes. The key of each
+    record is the key_length bytes starting at key_offset, compared as an
+    unsigned integer in the given byte order ("big" is the same as comparing
+    the key bytes lexicographically).
+
+    This is an LSD radix sort with one pass per key byte, least significant
+    byte first. Each pass reads the byte column with one extended slice,
+    counts it, and scatters whole records with slice copies between two
+    buffers. Passes where every record has the same byte are skipped.
+
+    :param buffer:          the records
+    :param record_width:    (int) the size of a record in bytes
+    :param key_offset:      (int) where the key starts within a record
+    :param key_length:      (int) the size of the key in bytes
+    :param in_place:        (bool) write the sorted records back into buffer,
+                            which must be writable and contiguous
+    :param byteorder:       (str) "big" or "little", the byte order of the
+                            key
+
+    :time complexity:       O(K(NW + 256)), where N is the number of records,
+                            W is record_width and K is key_length, since each
+                            pass copies every record once.
+
+    :space complexity:      O(NW)
+
+    :aux space complexity:  O(NW), for the two scatter buffers.
+
+    :return:                (bytearray or ndarray) the sorted records, or
+                            buffer itself if in_place is set
+    """
 
+    if key_offset < 0 or key_length < 0 or \
+            key_offset + key_length > record_width:
+        raise ValueError("the key must lie within the record")
+    if byteorder not in ("big", "little"):
+        raise ValueError("byteorder must be 'big' or 'little'")
+
+    is_array = np is not None and isinstance(buffer, np.ndarray)
+    if is_array:
+        if not buffer.flags.c_contiguous:
+            if in_place:
+                raise ValueError("radix_sort_records() can only sort a "
+                                 "contiguous array in place")
+            buffer = np.ascontiguousarray(buffer)
+        view = memoryview(buffer.reshape(-1).view(np.uint8))
+    else:
+        view = memoryview(buffer).cast("B")
+    if in_place and view.readonly:
+        raise TypeError("radix_sort_records() cannot sort a read-only "
+                        "buffer in place")
+    if len(view) % record_width:
+        raise ValueError("the buffer does not hold whole records")
+
+    n = len(view) // record_width
+    final_array = bytearray(view)
+    other_array = bytearray(len(final_array))
+
+    # key bytes from least to most significant
+    if byteorder == "big":
+        positions = range(key_offset + key_length - 1, key_offset - 1, -1)
+    else:
+        positions = range(key_offset, key_offset + key_length)
+
+    for position in positions:
+        # complexity: O(N)
+        column = final_array[position::record_width]
+        count_array = array("l", [0]) * 256
+        for digit in column:
+            count_array[digit] += 1
+        if max(count_array) == n:
+            continue
+
+        start = 0
+        for digit in range(256):
+            frequency = count_array[digit]
+            count_array[digit] = start
+            start += frequency
+
+        # complexity: O(NW)
+        source = 0
+        for digit in column:
+            target = count_array[digit] * record_width
+            other_array[target:target + record_width] = \
+                final_array[source:source + record_width]
+            count_array[digit] += 1
+            source += record_width
+
+        final_array, other_array = other_array, final_array
+
+    if in_place:
+        view[:] = final_array
+        return buffer
+    if is_array:
+        return np.frombuffer(final_array, dtype=buffer.dtype).reshape(
+            buffer.shape)
     return final_array
 
 
-def time_radix_sort():
+def time_radix_sort(base_list=None, num_keys=100000, seed=99,
+                    file_name='output_test.csv'):
     """
     Returns a list of tuples with (base, time) after timing radix sort on random
     sequence of numbers with different bases. Writes the tuples into a csv
-    file called 'output_test.csv'.
+    file called file_name. For sizes, key distributions, other backends and
+    memory use, see benchmark_sorts() and the command line of this module.
+
+    :param base_list:       (list) the bases to time, or None for 10^1 to
+                            10^23
+    :param num_keys:        (int) how many random 64-bit keys to sort
+    :param seed:            (int) the seed of the random keys
+    :param file_name:       (str) the csv file to write
 
     :time complexity:       Best and Worst Case: O(1). The function does not
                             depend on an input size.
@@ -117,15 +1993,13 @@ def time_radix_sort():
     :return                 (list) a list of tuples noting the (base, time)
 
     """
-    base_list = []
-    # for i in range(1, 24):
-    #     base_list.append(2**i)
-
-    for i in range(1, 24):
-        base_list.append(10**i)
+    if base_list is None:
+        base_list = []
+        for i in range(1, 24):
+            base_list.append(10**i)
 
     # Open csv file
-    with open('output_test.csv', 'w', newline='') as csv_file:
+    with open(file_name, 'w', newline='') as csv_file:
 
         # Initialise writer for csv.
         writer = csv.writer(csv_file)
@@ -133,10 +2007,9 @@ def time_radix_sort():
         for base in base_list:
             # initialise a new row to write
             row_to_write = [base]
-            # call random.seed() to ensure a proper distribution of numbers
-            random.seed(99)
-            # create test data
-            test_data = [random.randint(1, (2 ** 64) - 1) for _ in range(100000)]
+            # create test data, with the same seed for every base
+            test_data = _benchmark_keys("uniform", num_keys,
+                                        random.Random(seed))
             # start timer
             start = timeit.default_timer()
             radix_sort(test_data, base)
@@ -153,20 +2026,273 @@ def time_radix_sort():
     return time_list
 
 
-def find_rotations(string_list, p):
+def benchmark_sorts(sizes=(100000,), distributions=BENCHMARK_DISTRIBUTIONS,
+                    bases=(None,), backends=None, repeats=3, seed=99):
+    """
+    Time the sorting backends of this module against the built-in sorted()
+    on generated keys, for every combination of size, key distribution and
+    base. Each combination is run repeats times and the best time is kept,
+    then run once more under tracemalloc to measure the peak memory that
+    the sort allocates. Backends that need a power of two base skip the
+    other bases, and backends without a base (sorted(), numpy.sort) ignore
+    it, so every base has a baseline to compare with.
+
+    :param sizes:           (iterable) the numbers of keys to sort
+    :param distributions:   (iterable) names from BENCHMARK_DISTRIBUTIONS
+    :param bases:           (iterable) the bases to sort with, None meaning
+                            the planned base
+    :param backends:        (iterable) names of backends, or None for all of
+                            them that can run here, see _benchmark_backends()
+    :param repeats:         (int) how many timed runs per combination
+    :param seed:            (int) the seed of the generated keys
+
+    :time complexity:       O(R x S x D x B x K) sorts, for R repeats, S
+                            sizes, D distributions, B bases and K backends.
+    :space complexity:      O(N + T) for the largest size N and T results.
+    :aux space complexity:  O(N + T)
+
+    :return:                (list) one dict per result with the keys size,
+                            distribution, base, backend, best_seconds,
+                            mean_seconds, keys_per_second and peak_bytes
+    """
+
+    available = _benchmark_backends()
+    if backends is None:
+        backends = list(available)
+    for name in backends:
+        if name not in available:
+            raise ValueError("unknown or unavailable backend %r" % name)
+
+    results = []
+    for size in sizes:
+        for distribution in distributions:
+            keys = _benchmark_keys(distribution, size, random.Random(seed))
+            for base in bases:
+                for name in backends:
+                    prepare, run, needs_power_of_two = available[name]
+                    if needs_power_of_two and base is not None and \
+                            (base < 2 or base & (base - 1)):
+                        continue
+
+                    times = []
+                    for _ in range(max(1, repeats)):
+                        data = prepare(keys)
+                        start = timeit.default_timer()
+                        run(data, base)
+                        times.append(timeit.default_timer() - start)
+
+                    data = prepare(keys)
+                    tracemalloc.start()
+                    try:
+                        run(data, base)
+                        peak_bytes = tracemalloc.get_traced_memory()[1]
+                    finally:
+                        tracemalloc.stop()
+
+                    best = min(times)
+                    results.append({
+                        "size": size,
+                        "distribution": distribution,
+                        "base": base,
+                        "backend": name,
+                        "best_seconds": best,
+                        "mean_seconds": sum(times) / len(times),
+                        "keys_per_second": size / best if best else None,
+                        "peak_bytes": peak_bytes,
+                    })
+
+    return results
+
+
+def _benchmark_keys(distribution, n, rng):
+    """
+    Generate n benchmark keys, non-negative integers below 2^64.
+
+    - uniform:      uniformly random 64-bit keys
+    - zipf:         heavy-tailed keys, small values repeat very often
+    - narrow:       keys packed into a window of 1000 around a large random
+                    64-bit value, like timestamps of one batch
+    - presorted:    uniform keys, already in ascending order
+    - reversed:     uniform keys, in descending order
+
+    :param distribution:    (str) one of BENCHMARK_DISTRIBUTIONS
+    :param n:               (int) the number of keys
+    :param rng:             (Random) the source of randomness
+
+    :time complexity:       O(N log N) for the sorted distributions, O(N)
+                            otherwise.
+    :space complexity:      O(N)
+    :aux space complexity:  O(N)
+
+    :return:                (list) the keys
+    """
+
+    if distribution == "zipf":
+        return [min(int(rng.paretovariate(1.2)), _MASK_64) for _ in range(n)]
+    if distribution == "narrow":
+        low = rng.randint(0, (2 ** 64) - 1001)
+        return [low + rng.randint(0, 1000) for _ in range(n)]
+
+    if distribution not in BENCHMARK_DISTRIBUTIONS:
+        raise ValueError("unknown key distribution %r" % distribution)
+    keys = [rng.randint(1, (2 ** 64) - 1) for _ in range(n)]
+    if distribution == "presorted":
+        keys.sort()
+    elif distribution == "reversed":
+        keys.sort(reverse=True)
+    return keys
+
+
+def _benchmark_backends():
+    """
+    Return the backends that benchmark_sorts() can time here, in a dict
+    mapping each name to (prepare, run, needs_power_of_two). prepare copies
+    the keys into the input type of the backend outside of the timed
+    region, and run(data, base) performs the sort.
+
+    :time complexity:       O(1)
+    :space complexity:      O(1)
+    :aux space complexity:  O(1)
+
+    :return:                (dict) the available backends
+    """
+
+    backends = {
+        "sorted": (list, lambda data, base: sorted(data), False),
+        "radix_sort": (list, radix_sort, False),
+        "msd_radix_sort": (list, msd_radix_sort, True),
+        "american_flag_sort": (lambda keys: array("Q", keys),
+                               american_flag_sort, True),
+        "adaptive_sort": (list, lambda data, base: adaptive_sort(data),
+                          False),
+    }
+    if np is not None:
+        backends["radix_sort_numpy"] = (
+            lambda keys: np.array(keys, dtype=np.uint64), radix_sort_numpy,
+            False)
+        backends["adaptive_sort_numpy"] = (
+            lambda keys: np.array(keys, dtype=np.uint64),
+            lambda data, base: adaptive_sort(data), False)
+        backends["numpy.sort"] = (
+            lambda keys: np.array(keys, dtype=np.uint64),
+            lambda data, base: np.sort(data, kind="stable"), False)
+    return backends
+
+
+def main(argv=None):
+    """
+    Command line entry point of the benchmark suite, run as
+    python radix_counting_sorts.py --help. Prints a table of the results of
+    benchmark_sorts() and, with --output, writes them as JSON along with the
+    Python and NumPy versions so that runs can be compared across releases.
+
+    :param argv:            (list) the arguments, or None for sys.argv[1:]
+
+    :time complexity:       see benchmark_sorts()
+    :space complexity:      see benchmark_sorts()
+    :aux space complexity:  see benchmark_sorts()
+
+    :return:                (int) the exit status
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark the sorts of radix_counting_sorts.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000],
+                        help="numbers of keys to sort")
+    parser.add_argument("--distributions", nargs="+",
+                        choices=BENCHMARK_DISTRIBUTIONS,
+                        default=list(BENCHMARK_DISTRIBUTIONS),
+                        help="key distributions to generate")
+    parser.add_argument("--bases", type=_benchmark_base, nargs="+",
+                        default=[None],
+                        help="bases to sort with, 'auto' for the planned "
+                             "base")
+    backends = list(_benchmark_backends())
+    parser.add_argument("--backends", nargs="+", choices=backends,
+                        default=backends, help="backends to time")
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="timed runs per combination, the best is kept")
+    parser.add_argument("--seed", type=int, default=99,
+                        help="seed of the generated keys")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = benchmark_sorts(args.sizes, args.distributions, args.bases,
+                              args.backends, args.repeats, args.seed)
+
+    print("%10s %-10s %8s %-20s %12s %14s %12s" % (
+        "size", "keys", "base", "backend", "best (s)", "keys/s", "peak (B)"))
+    for result in results:
+        print("%10d %-10s %8s %-20s %12.6f %14.0f %12d" % (
+            result["size"], result["distribution"],
+            "auto" if result["base"] is None else result["base"],
+            result["backend"], result["best_seconds"],
+            result["keys_per_second"] or 0, result["peak_bytes"]))
+
+    if args.output:
+        report = {
+            "python": platform.python_version(),
+            "numpy": None if np is None else np.__version__,
+            "seed": args.seed,
+            "repeats": args.repeats,
+            "results": results,
+        }
+        with open(args.output, "w") as json_file:
+            json.dump(report, json_file, indent=2)
+
+    return 0
+
+
+def _benchmark_base(text):
+    """
+    Parse a --bases argument of main(): "auto" for the planned base, or an
+    integer of at least 2.
+
+    :param text:            (str) the argument
+
+    :time complexity:       O(1)
+    :space complexity:      O(1)
+    :aux space complexity:  O(1)
+
+    :return:                (int) the base, or None for "auto"
+    """
+
+    if text == "auto":
+        return None
+    try:
+        base = int(text)
+    except ValueError:
+        base = 0
+    if base < 2:
+        raise argparse.ArgumentTypeError(
+            "invalid base %r, expected 'auto' or an integer of at least 2"
+            % text)
+    return base
+
+
+def find_rotations(string_list, p, method="hash", engine=_STRING_ENGINE):
     """
     Return a list of strings that also appear in string_list after it has been
     rotated p times (rotated left if p is positive and rotated right if p is
     negative).
 
+    The strings are ordered by their rotations, and there are two methods
+    that give the same result. The "hash" method builds a set of the strings
+    and checks each string's p-rotation against it in one pass, see
+    _find_rotations_hashed(). The "sort" method, described below, sorts the
+    strings together with their rotations and finds the duplicates.
+    engine picks the string sort that either method uses, see
+    _sort_strings().
 
     :precondition:          Each string in string_list is unique. Strings in
                             the list will only contain lowercase alphabet
                             character (a-z).
 
-    :param string_list:     (list)  a list of strings
+    :param string_list:     (iterable)  the strings, read only once
     :param p:               (int)   number of left rotations if p is positive
                             or right rotations is p is negative
+    :param method:          (str)   "hash" or "sort"
+    :param engine:          (str)   the string sort, see _sort_strings()
 
     :time complexity:       Best Case and Worst Case: O(NM), where N is the
                             number of strings in string_list and M is the
@@ -174,8 +2300,8 @@ def find_rotations(string_list, p):
                             all strings in string_list. This is because
                             going each string in the list, rotating it
                             p times and appending it back to the list takes
-                            O(NM) time. Furthermore, after pre-processing
-                            and sorting the list, we need to find the duplicates
+                            O(NM) time. Furthermore, after sorting the list
+                            (O(NM) at most), we need to find the duplicates
                             in temp_array to find the desired strings and
                             this function _find_duplicates() takes O(NM) time
                             due to the comparison cost. Furthermore,
@@ -211,13 +2337,16 @@ def find_rotations(string_list, p):
                             also appear in string_list
     """
 
+    if method == "hash":
+        return _find_rotations_hashed(string_list, p, engine)
+    if method != "sort":
+        raise ValueError("unknown find_rotations() method %r" % method)
+
     # create temporary array to store string_list values so we do not modify
     # the input list
     # complexity: O(N)
     # aux space: O(N)
-    temp_array = [""] * len(string_list)
-    for i in range(len(string_list)):
-        temp_array[i] = string_list[i]
+    temp_array = list(string_list)
 
     # for string in string_list, rotate string and append to string_list
     # complexity: O(NM)
@@ -226,15 +2355,9 @@ def find_rotations(string_list, p):
     for i in range(n):
         temp_array.append(_p_rotation(temp_array[i], p))
 
-    # pre-process string_list according to length of string
-    # complexity worst case: O(N + M)
-    # aux space: O(M)
-    temp_array = _pre_process(temp_array)
-
-    # radix sort on entire list, temp_array
-    # complexity: O(N + M)
-    # aux space: O(1)
-    temp_array = _radix_sort_alphabet(temp_array)
+    # sort the entire list, temp_array
+    # complexity worst case: O(NM)
+    temp_array = _sort_strings(temp_array, engine)
 
     # remove duplicates and store in final_array
     # complexity worst case: O(NM)
@@ -252,6 +2375,715 @@ def find_rotations(string_list, p):
     return final_array
 
 
+def _find_rotations_hashed(string_list, p, engine=_STRING_ENGINE):
+    """
+    The "hash" method of find_rotations(). The strings are read into a set
+    once, every string's p-rotation is looked up in the set, and only the
+    rotations that are found are sorted, so that the result is in the same
+    order as the "sort" method gives.
+
+    :param string_list:     (iterable) the strings
+    :param p:               (int) number of left rotations if p is positive
+                            or right rotations is p is negative
+    :param engine:          (str) the string sort, see _sort_strings()
+
+    :time complexity:       Best Case: O(NM), where N is the number of
+                            strings and M is the length of the longest one,
+                            for hashing and rotating every string once, when
+                            no rotation is found.
+
+                            Worst Case: O(NM), plus the sort of the K
+                            rotations that are found, which is O(KM).
+
+    :space complexity:      O(NM), for the set of strings.
+
+    :aux space complexity:  O(NM), the set holds references to the N
+                            strings and the K matches are new strings of at
+                            most M characters each.
+
+    :return:                (list) the strings whose rotations are also in
+                            string_list, ordered by their rotations
+    """
+
+    # complexity: O(NM) to hash every string
+    string_set = set(string_list)
+
+    # complexity: O(NM) to rotate and look up every string
+    rotations = []
+    for string in string_set:
+        rotation = _p_rotation(string, p)
+        if rotation in string_set:
+            rotations.append(rotation)
+
+    # order by rotation, then undo the rotation
+    # complexity: O(KM)
+    rotations = _sort_strings(rotations, engine)
+    for i in range(len(rotations)):
+        rotations[i] = _p_rotation(rotations[i], -p)
+
+    return rotations
+
+
+class RotationIndex:
+    """
+    An index over a list of strings that answers find_rotations() for many
+    values of p without sorting again. The distinct strings are sorted once
+    when the index is built. A query then walks the sorted strings and, for
+    each string t of length L, looks up the string whose p-rotation is t.
+    Those lookups are built lazily, once per pair (L, p mod L), by rotating
+    the strings of length L and hashing the rotations that are in the list,
+    so queries whose p agree modulo a length share that work. Strings
+    whose length divides p are their own rotations and need no lookup.
+
+    == Attributes ==
+    strings:    (list) the distinct strings in lexicographic order
+    """
+
+    def __init__(self, string_list, engine=_STRING_ENGINE):
+        """
+        Build the index over the strings of string_list.
+
+        :param string_list:     (iterable) the strings, read only once
+        :param engine:          (str) the string sort used to order the
+                                strings, see _sort_strings()
+
+        :time complexity:       O(NM) plus the sort of the N distinct
+                                strings, where M is the length of the
+                                longest string.
+
+        :space complexity:      O(N), for the set, the sorted list and the
+                                groups by length, which all share the
+                                strings.
+
+        :aux space complexity:  O(N)
+
+        :return:                None
+        """
+        self._string_set = set(string_list)
+        self.strings = _sort_strings(list(self._string_set), engine)
+
+        # the strings of each length, so a rotation is only ever looked
+        # for among strings of the same length
+        self._by_length = {}
+        for string in self.strings:
+            self._by_length.setdefault(len(string), []).append(string)
+
+        # (length, left rotations) -> {rotation: string it came from}
+        self._sources = {}
+
+    def __len__(self):
+        """
+        Return the number of distinct strings in the index.
+
+        :time complexity:       O(1)
+        :space complexity:      O(1)
+        :aux space complexity:  O(1)
+
+        :return:                (int) the number of strings
+        """
+        return len(self.strings)
+
+    def rotations(self, p):
+        """
+        Return the strings whose p-rotation is also in the index, ordered by
+        their rotations. This is the same list as
+        find_rotations(string_list, p) with the "hash" method.
+
+        :param p:               (int) number of left rotations if p is
+                                positive or right rotations if p is negative
+
+        :time complexity:       O(N) hash lookups for N strings once the
+                                lookups of every length are built. Building
+                                the lookup for a length L and a rotation q
+                                takes O(KL) for the K strings of length L,
+                                and is done at most once per (L, q).
+
+        :space complexity:      O(N) for the result, plus O(K) for each new
+                                lookup that is built.
+
+        :aux space complexity:  O(N), for the result and the new lookups.
+
+        :return:                (list) the strings whose p-rotations are in
+                                the index
+        """
+        final_array = []
+        for string in self.strings:
+            length = len(string)
+            shift = p % length if length else 0
+
+            # rotating by a multiple of the length gives the string itself
+            if shift == 0:
+                final_array.append(string)
+                continue
+
+            sources = self._sources.get((length, shift))
+            if sources is None:
+                sources = {}
+                for source in self._by_length[length]:
+                    rotation = source[shift:] + source[:shift]
+                    if rotation in self._string_set:
+                        sources[rotation] = source
+                self._sources[(length, shift)] = sources
+
+            source = sources.get(string)
+            if source is not None:
+                final_array.append(source)
+
+        return final_array
+
+
+def rotation_classes(string_list, min_size=1, engine=_STRING_ENGINE):
+    """
+    Return the groups of strings in string_list that are rotations of each
+    other, for any number of rotations. This gives in one call what would
+    otherwise take find_rotations() for every p up to the longest length.
+
+    Two strings are rotations of each other exactly when they have the same
+    least rotation, so each string is keyed by least_rotation(), the strings
+    are bucketed by key, and the distinct keys are ordered with the string
+    sort engine. Within a class the strings keep their order in string_list.
+
+    :param string_list:     (iterable) the strings to group
+    :param min_size:        (int) leave out classes with fewer strings, e.g.
+                            2 to only keep strings that have a rotation in
+                            string_list other than themselves
+    :param engine:          (str) the string sort used to order the classes,
+                            see _sort_strings()
+
+    :time complexity:       O(T) plus the sort of the K distinct keys, where
+                            T is the total number of characters in
+                            string_list. Booth's algorithm is linear in the
+                            length of each string.
+
+    :space complexity:      O(T)
+
+    :aux space complexity:  O(T), for the keys and the classes.
+
+    :return:                (list) the classes, each a list of strings,
+                            ordered by their least rotation
+    """
+
+    # complexity: O(T)
+    classes = {}
+    for string in string_list:
+        classes.setdefault(least_rotation(string), []).append(string)
+
+    final_array = []
+    for key in _sort_strings(list(classes), engine):
+        if len(classes[key]) >= min_size:
+            final_array.append(classes[key])
+    return final_array
+
+
+def least_rotation(string):
+    """
+    Return the lexicographically least rotation of string, computed in
+    linear time with Booth's algorithm. Booth's algorithm runs the failure
+    function of Knuth-Morris-Pratt over the string doubled, and moves the
+    candidate start k forward whenever a smaller character shows that a
+    later rotation is smaller.
+
+    :param string:          (str) the string to rotate
+
+    :time complexity:       Best and Worst Case: O(M), where M is the length
+                            of string. The failure function of the doubled
+                            string is built in amortised linear time.
+
+    :space complexity:      O(M)
+
+    :aux space complexity:  O(M), for the doubled string and its failure
+                            function.
+
+    :return:                (str) the least rotation of string
+    """
+
+    doubled = string + string
+    failure = [-1] * len(doubled)
+
+    # k is the start of the least rotation found so far
+    k = 0
+    for j in range(1, len(doubled)):
+        char = doubled[j]
+        i = failure[j - k - 1]
+        while i != -1 and char != doubled[k + i + 1]:
+            if char < doubled[k + i + 1]:
+                k = j - i - 1
+            i = failure[i]
+        if char != doubled[k + i + 1]:
+            # i is -1 here, so doubled[k + i + 1] is doubled[k]
+            if char < doubled[k]:
+                k = j
+            failure[j - k] = -1
+        else:
+            failure[j - k] = i + 1
+
+    return string[k:] + string[:k]
+
+
+def msd_string_sort(string_list, cutoff=None):
+    """
+    Return a new list of the strings of string_list in lexicographic order,
+    the same order as sorted(). This is an MSD radix sort in the form of
+    multikey quicksort (three-way radix quicksort): each partition is split
+    three ways around a pivot character at one position, and only the
+    strings that share that character move on to the next position.
+
+    Unlike _radix_sort_alphabet(), which goes through every column up to
+    the length of the longest string, a character is only ever looked at
+    if it is needed to tell strings apart, so one long string does not slow
+    down the others. Strings of any length and any characters can be mixed:
+    a string that has ended sorts before every character. Partitions of at
+    most cutoff strings are finished with the built-in sort.
+
+    :param string_list:     (iterable) the strings to sort
+    :param cutoff:          (int) the largest partition handed to the
+                            built-in sort, or None for _MSD_CUTOFF
+
+    :time complexity:       Best Case: O(N), where N is the number of
+                            strings, when the strings differ in their first
+                            character.
+
+                            Worst Case: O(D + N log N) expected, where D is
+                            the total length of the distinguishing prefixes
+                            of the strings, i.e. the characters that have to
+                            be looked at to tell each string from the others.
+
+    :space complexity:      O(N), where N is the number of strings.
+
+    :aux space complexity:  O(N), for the new list and the stack of pending
+                            partitions.
+
+    :return:                (list) the sorted strings
+    """
+
+    if cutoff is None:
+        cutoff = _MSD_CUTOFF
+
+    final_array = list(string_list)
+
+    # stack of partitions (lo, hi, depth) still to sort, where every string
+    # in final_array[lo:hi] has the same first depth characters
+    stack = [(0, len(final_array), 0)]
+    while stack:
+        lo, hi, depth = stack.pop()
+
+        if hi - lo <= cutoff:
+            final_array[lo:hi] = sorted(final_array[lo:hi])
+            continue
+
+        # median of three characters at depth, -1 for an ended string
+        pivots = []
+        for string in (final_array[lo], final_array[(lo + hi) // 2],
+                       final_array[hi - 1]):
+            pivots.append(ord(string[depth]) if depth < len(string) else -1)
+        pivots.sort()
+        pivot = pivots[1]
+
+        # three-way partition: [lo, lt) less than the pivot, [lt, i) equal
+        # and (gt, hi) greater
+        # complexity: O(hi - lo)
+        lt = lo
+        i = lo
+        gt = hi - 1
+        while i <= gt:
+            string = final_array[i]
+            char = ord(string[depth]) if depth < len(string) else -1
+            if char < pivot:
+                final_array[lt], final_array[i] = string, final_array[lt]
+                lt += 1
+                i += 1
+            elif char > pivot:
+                final_array[gt], final_array[i] = string, final_array[gt]
+                gt -= 1
+            else:
+                i += 1
+
+        stack.append((lo, lt, depth))
+        stack.append((gt + 1, hi, depth))
+        # strings that have all ended at depth are equal, the rest share one
+        # more character
+        if pivot >= 0:
+            stack.append((lt, gt + 1, depth + 1))
+
+    return final_array
+
+
+def packed_string_sort(string_list):
+    """
+    Return a new list of the strings of string_list in lexicographic order,
+    by sorting integer keys instead of characters. The first _PACKED_CHARS
+    characters of each string are packed into a 64-bit key, 5 bits per
+    character, with the length folded into the low 4 bits, and the keys are
+    sorted in base 2^16, i.e. at most 4 integer passes however long the
+    strings are, with radix_sort_numpy() if NumPy is installed and
+    radix_sort() otherwise. Two strings with the same key are equal,
+    unless both are longer than _PACKED_CHARS characters: such runs share
+    their first _PACKED_CHARS characters and are finished with
+    msd_string_sort() on the characters that follow.
+
+    The packing only works for lowercase a-z. If any string has another
+    character, the whole list is sorted with msd_string_sort() instead.
+
+    :param string_list:     (iterable) the strings to sort
+
+    :time complexity:       Best Case: O(N), where N is the number of
+                            strings, when no two strings longer than
+                            _PACKED_CHARS share a packed key. Each key is
+                            built from at most _PACKED_CHARS characters.
+
+                            Worst Case: O(N) plus the msd_string_sort() of
+                            the long strings that share their first
+                            _PACKED_CHARS characters.
+
+    :space complexity:      O(N)
+
+    :aux space complexity:  O(N), for the keys, the sorting permutation and
+                            the new list.
+
+    :return:                (list) the sorted strings
+    """
+
+    final_array = list(string_list)
+    if len(final_array) < 2:
+        return final_array
+
+    # one C-level check of every character instead of one per string
+    joined = "".join(final_array)
+    if not (joined.isascii() and joined.isalpha() and joined.islower()):
+        return msd_string_sort(final_array)
+
+    # the first characters as base 32 digits, padded with zeros on the
+    # right, then the length, capped at one more than fits
+    # complexity: O(N)
+    long_length = _PACKED_CHARS + 1
+    keys = []
+    for string in final_array:
+        digits = string[:_PACKED_CHARS].translate(_PACKED_DIGITS)
+        keys.append(int(digits.ljust(_PACKED_CHARS, "0"), 32) << 4 |
+                    min(len(string), long_length))
+
+    # complexity: O(N) for at most 4 passes of base 2^16, with whole-array
+    # passes if NumPy is installed
+    if np is not None:
+        index_array = radix_sort_numpy(np.array(keys, dtype=np.uint64),
+                                       b=_PACKED_BASE, argsort=True).tolist()
+    else:
+        index_array = radix_sort(keys, b=_PACKED_BASE, argsort=True)
+    final_array = [final_array[i] for i in index_array]
+    keys = [keys[i] for i in index_array]
+
+    # finish the runs of long strings that have the same key
+    # complexity: O(N) plus the sort of those runs
+    i = 0
+    n = len(final_array)
+    while i < n:
+        if keys[i] & 15 != long_length:
+            i += 1
+            continue
+        j = i + 1
+        while j < n and keys[j] == keys[i]:
+            j += 1
+        if j - i > 1:
+            final_array[i:j] = msd_string_sort(final_array[i:j])
+        i = j
+
+    return final_array
+
+
+class _BurstNode:
+    """
+    A node of the burst trie built by burst_sort(). Every string below a
+    node at depth d shares its first d characters.
+
+    == Attributes ==
+    ended:      (list) the strings that end at this node, all equal
+    children:   (dict) the next character -> a bucket (list) of the strings
+                that continue with it, or a _BurstNode once the bucket has
+                burst
+    """
+
+    __slots__ = ("ended", "children")
+
+    def __init__(self):
+        """
+        Create a node with no strings.
+
+        :time complexity:       O(1)
+        :space complexity:      O(1)
+        :aux space complexity:  O(1)
+
+        :return:                None
+        """
+        self.ended = []
+        self.children = {}
+
+
+def burst_sort(string_list, threshold=None):
+    """
+    Return a new list of the strings of string_list in lexicographic order,
+    the same order as sorted(), with burstsort. Each string is inserted into
+    a shallow trie whose leaves are buckets: a string walks down the trie
+    nodes by its characters until it reaches a bucket, and a bucket that
+    grows past threshold strings bursts into a new node, its strings moving
+    one character down. The trie is then walked in order, the strings that
+    end at a node first and then its children by character, and each bucket
+    is sorted on its own with the built-in sort.
+
+    Unlike _radix_sort_alphabet(), which goes through every string on every
+    column, each string is only touched while it is inserted and when its
+    small bucket is sorted, so the work on a bucket stays within a few
+    thousand strings. Strings of any length and any characters can be mixed.
+
+    :param string_list:     (iterable) the strings to sort
+    :param threshold:       (int) the most strings a bucket holds before it
+                            bursts, or None for _BURST_THRESHOLD
+
+    :time complexity:       Best Case: O(N), where N is the number of
+                            strings, when no bucket bursts and the strings
+                            differ in their first character.
+
+                            Worst Case: O(D + N log T), where D is the total
+                            length of the prefixes the trie consumes and T
+                            is the threshold. Each burst moves at most T
+                            strings, and a string moves at most once per
+                            character of its prefix.
+
+    :space complexity:      O(N), where N is the number of strings.
+
+    :aux space complexity:  O(N + K), for the buckets and the K trie nodes,
+                            and the new list.
+
+    :return:                (list) the sorted strings
+    """
+
+    if threshold is None:
+        threshold = _BURST_THRESHOLD
+
+    # insert every string, bursting full buckets
+    # complexity: O(D) plus the strings moved by bursts
+    root = _BurstNode()
+    pending = [(root, 0, string) for string in string_list]
+    while pending:
+        node, depth, string = pending.pop()
+        while True:
+            if depth == len(string):
+                node.ended.append(string)
+                break
+            char = string[depth]
+            child = node.children.get(char)
+            if child is None:
+                node.children[char] = [string]
+                break
+            if type(child) is list:
+                child.append(string)
+                if len(child) > threshold:
+                    # burst: the strings move into a new node, one
+                    # character further down
+                    node.children[char] = burst = _BurstNode()
+                    for moved in child:
+                        pending.append((burst, depth + 1, moved))
+                break
+            node = child
+            depth += 1
+
+    # walk the trie in order, sorting each bucket
+    # complexity: O(K log K) for the children and O(N log T) for the buckets
+    final_array = []
+    stack = [root]
+    while stack:
+        item = stack.pop()
+        if type(item) is list:
+            item.sort()
+            final_array.extend(item)
+            continue
+        final_array.extend(item.ended)
+        for char in sorted(item.children, reverse=True):
+            stack.append(item.children[char])
+
+    return final_array
+
+
+def _sort_strings(string_list, engine):
+    """
+    Sort string_list with the string sort called engine:
+
+    - "msd": msd_string_sort(), which only looks at the characters needed
+      to tell the strings apart.
+    - "lsd": _pre_process() followed by _radix_sort_alphabet(), one pass
+      per column up to the longest string (lowercase a-z only).
+    - "packed": packed_string_sort(), which radix sorts the strings as
+      packed integer keys, and falls back to "msd" for anything other than
+      lowercase a-z.
+    - "burst": burst_sort(), which sorts small buckets of a burst trie.
+
+    The input list may be modified.
+
+    :param string_list:     (list) the strings to sort
+    :param engine:          (str) the name of the string sort
+
+    :time complexity:       see the string sort
+    :space complexity:      see the string sort
+    :aux space complexity:  see the string sort
+
+    :return:                (list) the sorted strings
+    """
+
+    if engine == "msd":
+        return msd_string_sort(string_list)
+    if engine == "lsd":
+        return _radix_sort_alphabet(_pre_process(string_list))
+    if engine == "packed":
+        return packed_string_sort(string_list)
+    if engine == "burst":
+        return burst_sort(string_list)
+    raise ValueError("unknown string sort engine %r" % engine)
+
+
+def sort_file_lines(in_path, out_path, cutoff=None):
+    """
+    Sort the newline-delimited lines of the file at in_path by their raw
+    bytes and write them to out_path, each followed by a newline. The file
+    is memory-mapped and never decoded: each line is recorded as an offset
+    and a length in two array('Q'), and an array of line numbers is MSD
+    radix sorted by reading the bytes of the lines straight from the map.
+    The lines are then written out from memoryview slices of the map, and
+    are never decoded into strings. Byte order is the same as the order of
+    the decoded strings for ASCII and UTF-8 text.
+
+    Each partition is split into 257 buckets, one for the lines that end at
+    the current position and one per byte value, and a partition whose
+    lines all share the byte moves on to the next position without being
+    moved. Partitions of at most cutoff lines are finished with the
+    built-in sort, keyed by a bytes copy of the remaining bytes of each
+    line. Since almost every line ends up in such a partition, this is not
+    zero-copy: most lines are copied once, but only cutoff of them are held
+    at a time.
+
+    :param in_path:         (str) the file of lines to sort
+    :param out_path:        (str) the file to write the sorted lines to
+    :param cutoff:          (int) the largest partition handed to the
+                            built-in sort, or None for _MSD_CUTOFF
+
+    :time complexity:       O(S + D), where S is the size of the file and D
+                            is the total length of the distinguishing
+                            prefixes of the lines. Finding the lines reads
+                            the file once and each partition costs its size
+                            plus the 257 buckets.
+
+    :space complexity:      O(S + N) for N lines, the file being mapped
+                            rather than read into memory.
+
+    :aux space complexity:  O(N + CL): 24 bytes per line for the offsets,
+                            lengths and line numbers, and the stack of
+                            partitions, plus the copied keys of a partition
+                            of at most C = cutoff lines of length at most L.
+
+    :return:                (int) the number of lines written
+    """
+
+    if cutoff is None:
+        cutoff = _MSD_CUTOFF
+
+    with open(in_path, "rb") as in_file, open(out_path, "wb") as out_file:
+        if os.fstat(in_file.fileno()).st_size == 0:
+            return 0
+
+        with mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # record where every line starts and how long it is
+            # complexity: O(S)
+            offsets = array("Q")
+            lengths = array("Q")
+            start = 0
+            size = len(mm)
+            while start < size:
+                end = mm.find(b"\n", start)
+                if end == -1:
+                    end = size
+                offsets.append(start)
+                lengths.append(end - start)
+                start = end + 1
+
+            order = array("Q", range(len(offsets)))
+            _sort_line_references(mm, offsets, lengths, order, cutoff)
+
+            # complexity: O(S)
+            view = memoryview(mm)
+            try:
+                for line in order:
+                    start = offsets[line]
+                    out_file.write(view[start:start + lengths[line]])
+                    out_file.write(b"\n")
+            finally:
+                view.release()
+
+    return len(order)
+
+
+def _sort_line_references(mm, offsets, lengths, order, cutoff):
+    """
+    Sort order, an array of line numbers, in place by the bytes of the lines
+    in mm, where line i is mm[offsets[i]:offsets[i] + lengths[i]]. This is
+    the radix sort of sort_file_lines(), see it for the details.
+
+    :param mm:              (mmap) the mapped file
+    :param offsets:         (array) the offset of each line
+    :param lengths:         (array) the length of each line
+    :param order:           (array) the line numbers to sort
+    :param cutoff:          (int) the largest partition handed to the
+                            built-in sort
+
+    :time complexity:       see sort_file_lines()
+    :space complexity:      see sort_file_lines()
+    :aux space complexity:  see sort_file_lines()
+
+    :return:                None
+    """
+
+    # stack of partitions (lo, hi, depth) still to sort, where the lines of
+    # order[lo:hi] share their first depth bytes
+    stack = [(0, len(order), 0)]
+    while stack:
+        lo, hi, depth = stack.pop()
+
+        if hi - lo <= cutoff:
+            order[lo:hi] = array("Q", sorted(
+                order[lo:hi], key=lambda line: mm[
+                    offsets[line] + depth:offsets[line] + lengths[line]]))
+            continue
+
+        # bucket 0 holds the lines that end at depth, bucket c + 1 the lines
+        # whose byte at depth is c
+        # complexity: O(hi - lo)
+        count_array = array("l", [0]) * 257
+        for line in order[lo:hi]:
+            if depth < lengths[line]:
+                count_array[mm[offsets[line] + depth] + 1] += 1
+            else:
+                count_array[0] += 1
+
+        # every line has the same byte here, go straight to the next one
+        if max(count_array) == hi - lo:
+            if count_array[0] == 0:
+                stack.append((lo, hi, depth + 1))
+            continue
+
+        position = lo
+        for bucket in range(257):
+            frequency = count_array[bucket]
+            count_array[bucket] = position
+            if frequency > 1 and bucket > 0:
+                stack.append((position, position + frequency, depth + 1))
+            position += frequency
+
+        for line in order[lo:hi]:
+            if depth < lengths[line]:
+                bucket = mm[offsets[line] + depth] + 1
+            else:
+                bucket = 0
+            order[count_array[bucket]] = line
+            count_array[bucket] += 1
+
+
 def _p_rotation(string, p):
     """
     Return string rotated left p times if p is positive or right p times if p
@@ -267,21 +3099,15 @@ def _p_rotation(string, p):
                         returns early if this is the case.
 
                         Worst Case: O(M), where M is the length of the
-                        string. This is because to split the string into a list
-                        of characters, it takes O(M) time and then to rotate the
-                        strings it takes O(2p) time, where p is the number of
-                        rotations. p has been manipulated to always be less than
-                        M, therefore the total time complexity is O(M + 2p)
-                        which is less than O(M + 2M) which can be simplified
-                        to O(M).
+                        string. p is first reduced modulo M so that it is
+                        always less than M, and then the two slices and their
+                        concatenation copy M characters in total.
 
     :space complexity:      O(M), where M is the length of the string. This is
-                            because input size is M and we use an auxiliary
-                            space of O(M) since we use an additional list
-                            of size M.
-    :aux space complexity:  O(M), where M is the length of the string. This is
-                            because we split the string into a list of size
-                            M.
+                            because input size is M and the rotated string
+                            takes O(M) space.
+    :aux space complexity:  O(M), where M is the length of the string, for
+                            the two slices and the rotated string.
 
     :return:        (str) the rotated string
     """
@@ -290,24 +3116,12 @@ def _p_rotation(string, p):
     if len(string) < 2:
         return string
 
-    # split string into list
-    # O(M) complexity
-    word = [char for char in string]
-    length = len(string)
-
-    # find equivalent of negative p (right rotations) in positive p (left
-    # rotations)
-    if p < 0:
-        p += ((abs(p) // length) + 1) * length
-
-    # to make sure p is always less than len(string)
-    p = abs(p) % length
-
-    # complexity: O(p)
-    word.extend(word[:p])
+    # Python's modulo turns right rotations (negative p) into the
+    # equivalent left rotations and makes sure p is less than len(string)
+    p %= len(string)
 
-    # complexity: O(p)
-    return "".join(word[p:])
+    # complexity: O(M), two slices and a concatenation
+    return string[p:] + string[:p]
 
 
 def _pre_process(string_list):
@@ -465,12 +3279,68 @@ def _radix_sort_alphabet(string_list):
     return string_list
 
 
+def group_sorted(sorted_values, boundaries=False):
+    """
+    Group the runs of equal values in sorted_values, which must be sorted
+    (e.g. by radix_sort() or msd_string_sort()) so that equal values are
+    next to each other. Works for integers, strings or anything else that
+    can be compared with ==. Returns the distinct values with the length of
+    their runs, or with the run boundaries so that other columns in the same
+    order can be aggregated per group: the rows of group i are
+    column[starts[i]:starts[i + 1]].
+
+    This is one linear pass into outputs preallocated for the worst case of
+    all values being distinct, which are then truncated to the number of
+    groups.
+
+    :param sorted_values:   (list) the sorted values
+    :param boundaries:      (bool) return run boundaries instead of counts
+
+    :time complexity:       Best and Worst Case: O(N), where N is the length
+                            of sorted_values, times the cost of comparing two
+                            values (O(M) for strings of length M).
+
+    :space complexity:      O(N)
+
+    :aux space complexity:  O(N), for the distinct values and the counts or
+                            boundaries.
+
+    :return:                (tuple) (values, counts) where counts is an
+                            array('l') with one count per value, or (values,
+                            starts) where starts is an array('l') of the
+                            first index of every run followed by N
+    """
+
+    n = len(sorted_values)
+    values = [None] * n
+    runs = array("l", [0]) * (n + 1)
+
+    # runs[k] is the index where run k starts
+    k = 0
+    for i in range(n):
+        value = sorted_values[i]
+        if i == 0 or value != values[k - 1]:
+            values[k] = value
+            runs[k] = i
+            k += 1
+    runs[k] = n
+
+    del values[k:]
+    if boundaries:
+        return values, runs[:k + 1]
+
+    counts = array("l", [0]) * k
+    for i in range(k):
+        counts[i] = runs[i + 1] - runs[i]
+    return values, counts
+
+
 def _find_duplicates(string_list):
     """
-    Return the duplicates in string_list. This does not modify the input list.
+    Return the values that occur more than once in string_list, once each and
+    in sorted order. This does not modify the input list.
 
-    :precondition:          string_list is already sorted, and each string has
-                            at most one other string that is the same
+    :precondition:          string_list is already sorted
     :param string_list:     (list) a list of strings to search
 
     :time complexity:       Best Case: O(NM), where N is the length of
@@ -480,69 +3350,24 @@ def _find_duplicates(string_list):
 
                             Worst Case: O(NM), where N is the length of
                             string_list and M is the length of the longest
-                            string in string_list. This occurs when there are
-                            two strings in string_list. The outer while loop
-                            iterates at most N times and the comparison
-                            inside the loop takes at most O(M) time since
-                            since we are comparing strings. _swap() function
-                            takes O(1) time so this is negligible.
+                            string in string_list. group_sorted() makes one
+                            pass over the list and each comparison inside it
+                            takes at most O(M) time since we are comparing
+                            strings.
 
     :space complexity:      O(N), where N is the length of string_list since
                             auxiliary space is O(N) and input list is O(N).
 
-    :aux space complexity:  O(N), where N is the length of string_list. This
-                            list splicing operation at the end returns
-                            a new list that is at most length N.
+    :aux space complexity:  O(N), where N is the length of string_list, for
+                            the groups of group_sorted() and the list of
+                            duplicates.
 
     :return:                (list) list of strings that are the duplicates
     """
 
-    # handle boundary cases, an empty list or a list with one item in it
-    # does not have duplicates, so return early
-    if len(string_list) < 2:
-        return []
-
-    i = 0
-    j = 0
-
-    # go through the list to swap elements that are duplicates and push
-    # them to the end of the list
-    while i < len(string_list)-1:
-        # complexity: O(b)
-        if string_list[j] == string_list[i+1]:
-            i += 1
-        else:
-            _swap(string_list, j+1, i+1)
-            j += 1
-            i += 1
+    values, counts = group_sorted(string_list)
+    return [value for value, count in zip(values, counts) if count > 1]
 
-    # all the duplicate values will be at string_list[j+1:] so return this
-    return string_list[j+1:]
-
-
-def _swap(a_list, i, j):
-    """
-    Swap element at a_list[i] with element at a_list[j] and vice versa.
-    Do nothing if i and j are not valid indexes.
-
-    :param a_list:          (list) the list to modify
-    :param i:               (int) the index that specifies the element to swap
-    :param j:               (int) the index that specifies the element to swap
-
-    :time complexity:       O(1), since accessing and re-assigning elements
-                            in a list takes constant time.
-
-    :space complexity:      O(N), where N is the size of the a_list. This is
-                            because auxiliary space is O(1).
-
-    :aux space complexity:  O(1), since the algorithm does not require
-                            additional space.
-
-    :return:                None
-    """
-
-    try:
-        a_list[i], a_list[j] = a_list[j], a_list[i]
-    except IndexError:
-        pass
 
+if __name__ == "__main__":
+    sys.exit(main())